@@ -4,22 +4,45 @@ Flask 앱 생성 + Blueprint 등록 + 서버 초기화
 세부 기능은 각 모듈에서 관리:
   settings.py     - 설정 로드 (config.py / 환경변수)
   database.py     - SQLite 연결 및 초기화
-  prices.py       - 자산 가격 조회 (yfinance, CoinGecko)
+  prices.py       - 자산 가격 조회 (yfinance, CoinGecko 외)
+  evaluation.py   - 예측 자동 채점 (적중/실패)
+  hedge.py        - 비트코인·환율 다중 공급자 헤지 조회 + 공급자별 지연·채택률 통계
+  circuit.py      - 가격 공급자별 서킷 브레이커 (장애 시 빠른 실패 + 마지막 가격 유지)
+  cache.py        - 티커 검색/검증 결과 TTL·LRU 캐시
+  http_client.py  - 외부 HTTP 공용 세션 (keep-alive, 재시도, 타임아웃)
   telegram_bot.py - 텔레그램 전송 및 봇 폴링
-  scheduler.py    - APScheduler 주기적 업데이트
+  scheduler.py    - APScheduler 주기적 업데이트 (시장 그룹별 작업)
+  markets.py      - 시장 그룹 분류 및 장중 여부 (KRX / NYSE / FX·원자재 / 크립토)
+  jobs.py         - 가격 갱신 / 리포트 단일 실행 보장 (합류·병합) 및 작업 상태
+  events.py       - 변경 알림 SSE 브로드캐스트
+  metrics.py      - 카운터/히스토그램 레지스트리 + /metrics (Prometheus 텍스트 형식)
+  profiling.py    - 관리자용 cProfile 호출 트리 + 느린 요청(쿼리별 시간) 로그
+  worker.py       - 백그라운드 작업 리더 선출 (스케줄러 + 봇을 한 프로세스에서만)
   routes.py       - 모든 Flask API 라우트
 """
 import os
-import threading
+import sys
+import time
 
-from flask import Flask
+_boot_started = time.perf_counter()
+
+from flask import Flask  # noqa: E402
+
+from settings import SECRET_KEY              # noqa: E402
+from database import init_db                 # noqa: E402
+from korean_stocks import load_listing       # noqa: E402
+from worker import start_background          # noqa: E402
+from routes import bp                        # noqa: E402
+
+_boot_steps = [("imports", time.perf_counter() - _boot_started)]
+
+
+def _boot_step(name: str, fn):
+    """시작 단계 하나를 실행하고 소요 시간 기록"""
+    started = time.perf_counter()
+    fn()
+    _boot_steps.append((name, time.perf_counter() - started))
 
-from settings import SECRET_KEY
-from database import init_db
-from prices import update_all_prices
-from scheduler import scheduler, reset_scheduler
-from telegram_bot import run_telegram_bot
-from routes import bp
 
 # ─────────────────────────────────────────────
 #  Flask 앱 생성 및 Blueprint 등록
@@ -32,11 +55,14 @@ app.register_blueprint(bp)
 #  앱 초기화 (gunicorn / python 모두 실행)
 # ─────────────────────────────────────────────
 print("🥔 알감자지수 서버 시작 중...")
-init_db()
-threading.Thread(target=update_all_prices, daemon=True).start()
-reset_scheduler()
-scheduler.start()
-threading.Thread(target=run_telegram_bot, daemon=True).start()
+_boot_step("init_db", init_db)
+_boot_step("load_listing", load_listing)
+_boot_step("start_background", start_background)  # 스케줄러·텔레그램 봇은 임대를 가진 프로세스 하나에서만 실행
+print(
+    f"[startup] {time.perf_counter() - _boot_started:.2f}s — "
+    + ", ".join(f"{name} {sec:.2f}s" for name, sec in _boot_steps)
+    + (" (yfinance 로드됨)" if "yfinance" in sys.modules else "")
+)
 
 # ─────────────────────────────────────────────
 #  직접 실행 시 (python app.py / py app.py)
@@ -0,0 +1,12 @@
+"""
+벤치마크 도구 모음 - 외부 서비스(Yahoo, CoinGecko, 텔레그램) 없이 로컬에서 성능 측정
+  dataset.py - 합성 algamja.db 생성 (예측 N건 + 수년치 가격 이력·daily_index)
+  stubs.py   - 가격 조회 / 티커 검색 / 텔레그램 전송을 지연 시간을 지정할 수 있는 결정적 대역으로 교체
+  suite.py   - routes.py 엔드포인트별 p50/p99 + 가격 갱신·리포트 사이클 시간
+  stub_app.py - 대역을 끼운 WSGI 진입점 (gunicorn bench.stub_app:app) + SQLite 잠금 오류 집계
+  loadtest.py - asyncio 부하 생성기: 가상 브라우저 N개 + 관리자 쓰기 + /api/refresh
+
+실행 (저장소 루트에서):
+  python -m bench.suite --sizes 1000,100000,1000000 --years 3 --out bench_output.txt
+  python -m bench.loadtest --browsers 200 --sse --duration 300
+"""
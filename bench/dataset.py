@@ -0,0 +1,96 @@
+"""
+합성 DB 생성 - 예측 N건 + 커스텀 종목 + 수년치 price_history / daily_index
+DATABASE_PATH 환경변수가 가리키는 파일에 생성 (database 모듈 import 전에 설정돼 있어야 함)
+같은 파라미터로 이미 만든 파일이면 재사용
+"""
+import random
+import time
+from datetime import date, datetime, timedelta
+
+BATCH_SIZE = 50_000
+
+
+def _spec(predictions: int, years: int, custom_assets: int, seed: int) -> str:
+    return f"predictions={predictions};years={years};custom={custom_assets};seed={seed}"
+
+
+def build(predictions: int, years: int = 3, custom_assets: int = 200, seed: int = 42) -> bool:
+    """합성 데이터 생성 → 새로 만들었으면 True, 기존 파일 재사용이면 False"""
+    from database import init_db, get_db, get_meta, set_meta
+    from prices import ASSET_LIST
+
+    init_db()
+    conn = get_db()
+    try:
+        spec = _spec(predictions, years, custom_assets, seed)
+        if get_meta(conn, "bench_dataset") == spec:
+            return False
+        if conn.execute("SELECT 1 FROM predictions LIMIT 1").fetchone():
+            raise RuntimeError(f"벤치마크용이 아닌 데이터가 있는 DB입니다 ({get_meta(conn, 'bench_dataset')})")
+
+        started = time.perf_counter()
+        rng     = random.Random(seed)
+        today   = date.today()
+        days    = years * 365
+        customs = [(f"BENCH{i:04d}", f"{100000 + i:06d}.KS") for i in range(custom_assets)]
+        assets  = [(a, None) for a in ASSET_LIST] + customs
+
+        # 1) 자산별 일간 가격 이력 (랜덤 워크) — 채점·차트 조회가 실제처럼 범위 스캔하도록
+        closes = {}
+        for name, _ in assets:
+            price, series = rng.uniform(10, 100_000), []
+            for d in range(days, -1, -1):
+                price = max(0.01, price * (1 + rng.gauss(0, 0.02)))
+                series.append(((today - timedelta(days=d)).isoformat() + "T15:30:00", round(price, 2)))
+            closes[name] = series
+            conn.executemany(
+                "INSERT OR IGNORE INTO price_history (asset_market, ts, price) VALUES (?,?,?)",
+                [(name, ts, p) for ts, p in series],
+            )
+            conn.execute(
+                "INSERT OR REPLACE INTO prices (asset_market, current_price, updated_at) VALUES (?,?,?)",
+                (name, series[-1][1], datetime.now().isoformat(timespec="seconds")),
+            )
+        conn.commit()
+
+        # 2) 예측 — 집계 트리거가 asset_stats / index_totals 를 함께 유지
+        sql = ("INSERT INTO predictions (asset_market, ticker, mention_date, mention_price, direction, hit, miss) "
+               "VALUES (?,?,?,?,?,?,?)")
+        batch = []
+        for _ in range(predictions):
+            name, ticker = rng.choice(assets)
+            offset       = rng.randint(0, days)
+            ts, price    = closes[name][days - offset]
+            hit = rng.randint(0, 1) if offset > 30 else 0
+            miss = (1 - hit) if offset > 30 else 0
+            batch.append((name, ticker, ts[:10], price, rng.choice(("UP", "DOWN")), hit, miss))
+            if len(batch) >= BATCH_SIZE:
+                conn.executemany(sql, batch)
+                conn.commit()
+                batch = []
+        if batch:
+            conn.executemany(sql, batch)
+
+        # 3) daily_index 수년치
+        conn.executemany(
+            "INSERT OR REPLACE INTO daily_index (date, algamja_index) VALUES (?,?)",
+            [((today - timedelta(days=d)).isoformat(), round(rng.uniform(30, 70), 2)) for d in range(days, 0, -1)],
+        )
+        set_meta(conn, "bench_dataset", spec)
+        conn.commit()
+        print(f"[bench] 합성 DB 생성: 예측 {predictions:,}건, 자산 {len(assets)}개, {years}년치 "
+              f"({time.perf_counter() - started:.1f}s)")
+        return True
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="합성 algamja.db 생성 (DATABASE_PATH 위치)")
+    parser.add_argument("--size", type=int, default=1000, help="예측 건수")
+    parser.add_argument("--years", type=int, default=3, help="가격 이력 / daily_index 기간(년)")
+    parser.add_argument("--custom-assets", type=int, default=200, help="합성 개별종목 수")
+    args = parser.parse_args()
+    build(args.size, args.years, args.custom_assets)
@@ -0,0 +1,408 @@
+"""
+부하 테스트 - 로컬 gunicorn(bench.stub_app, 외부 서비스 대역)에 가상 브라우저 N개를 붙여
+처리량, 꼬리 지연, 오류율, SQLite 잠금 경합을 측정 (표준 라이브러리 asyncio만 사용)
+
+가상 브라우저 = templates/index.html 과 같은 순서:
+  GET / (초기 데이터 포함) → /api/events SSE 구독(--sse) → --interval 초마다 loadAll
+  (loadAll = If-None-Match 를 붙인 GET /api/dashboard, SSE change 이벤트가 오면 즉시 한 번 더)
+여기에 관리자 쓰기(추가 → 수정 → 결과 입력 → 삭제)와 /api/refresh 트리거를 섞음
+
+  python -m bench.loadtest --browsers 200 --duration 300
+  python -m bench.loadtest --browsers 500 --sse --workers 1 --threads 32 --size 100000
+  python -m bench.loadtest --url http://127.0.0.1:8000 --browsers 50   # 이미 떠 있는 서버 대상
+"""
+import argparse
+import asyncio
+import glob
+import json
+import os
+import random
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+from urllib.parse import urlsplit
+
+from bench.suite import percentile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+REQUEST_TIMEOUT = 30   # 초 — 이보다 오래 걸린 요청은 타임아웃 오류로 집계
+
+
+# ─────────────────────────────────────────────
+#  최소 HTTP/1.1 클라이언트 (keep-alive, chunked 응답 지원)
+# ─────────────────────────────────────────────
+class HTTPConnection:
+    def __init__(self, host: str, port: int):
+        self.host, self.port = host, port
+        self.reader = self.writer = None
+        self.cookie = None
+
+    async def _connect(self):
+        self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+
+    def close(self):
+        if self.writer:
+            self.writer.close()
+        self.reader = self.writer = None
+
+    async def _send(self, method: str, path: str, body: bytes = None, headers: dict = None):
+        if self.writer is None:
+            await self._connect()
+        lines = [f"{method} {path} HTTP/1.1", f"Host: {self.host}:{self.port}", "Connection: keep-alive"]
+        if self.cookie:
+            lines.append(f"Cookie: {self.cookie}")
+        for k, v in (headers or {}).items():
+            lines.append(f"{k}: {v}")
+        if body is not None:
+            lines += ["Content-Type: application/json", f"Content-Length: {len(body)}"]
+        self.writer.write(("\r\n".join(lines) + "\r\n\r\n").encode() + (body or b""))
+        await self.writer.drain()
+
+    async def _read_head(self):
+        status_line = await self.reader.readline()
+        if not status_line:
+            raise ConnectionError("서버가 연결을 닫음")
+        status  = int(status_line.split()[1])
+        headers = {}
+        while True:
+            line = (await self.reader.readline()).decode("latin-1").strip()
+            if not line:
+                break
+            k, _, v = line.partition(":")
+            headers[k.strip().lower()] = v.strip()
+        if "set-cookie" in headers:
+            self.cookie = headers["set-cookie"].split(";", 1)[0]
+        return status, headers
+
+    async def _read_chunk(self) -> bytes:
+        size = int((await self.reader.readline()).strip().split(b";")[0], 16)
+        data = await self.reader.readexactly(size + 2)
+        return data[:-2]
+
+    async def request(self, method: str, path: str, json_body=None, headers: dict = None):
+        """→ (status, headers, body bytes) — 연결이 끊겨 있으면 한 번 재연결"""
+        body = json.dumps(json_body).encode() if json_body is not None else None
+        for attempt in (1, 2):
+            try:
+                await self._send(method, path, body, headers)
+                status, resp_headers = await self._read_head()
+                break
+            except (ConnectionError, asyncio.IncompleteReadError, OSError):
+                self.close()
+                if attempt == 2:
+                    raise
+        if method == "HEAD" or status < 200 or status in (204, 304):
+            data = b""  # RFC 9112 6.3 — 본문이 없는 응답 (Content-Length 없이 keep-alive 로 옴)
+        elif resp_headers.get("transfer-encoding") == "chunked":
+            parts = []
+            while True:
+                chunk = await self._read_chunk()
+                if not chunk:
+                    break
+                parts.append(chunk)
+            data = b"".join(parts)
+        elif "content-length" in resp_headers:
+            data = await self.reader.readexactly(int(resp_headers["content-length"]))
+        else:
+            data = await self.reader.read()
+            self.close()
+        if resp_headers.get("connection", "").lower() == "close":
+            self.close()
+        return status, resp_headers, data
+
+    async def stream(self, path: str):
+        """SSE 스트림 — 받은 텍스트 조각을 차례로 yield"""
+        await self._send("GET", path, headers={"Accept": "text/event-stream"})
+        status, headers = await self._read_head()
+        if status != 200:
+            raise ConnectionError(f"SSE {status}")
+        while True:
+            if headers.get("transfer-encoding") == "chunked":
+                chunk = await self._read_chunk()
+            else:
+                chunk = await self.reader.read(4096)
+            if not chunk:
+                return
+            yield chunk.decode("utf-8", "replace")
+
+
+# ─────────────────────────────────────────────
+#  측정값 수집
+# ─────────────────────────────────────────────
+class Recorder:
+    def __init__(self):
+        self.latency  = {}   # 라벨 → [초]
+        self.statuses = {}   # 라벨 → {상태코드: 횟수}
+        self.errors   = {}   # 라벨 → {오류 종류: 횟수}
+        self.sse      = {"connected": 0, "change_events": 0, "disconnects": 0}
+
+    def ok(self, label: str, status: int, elapsed: float):
+        self.latency.setdefault(label, []).append(elapsed)
+        counts = self.statuses.setdefault(label, {})
+        counts[status] = counts.get(status, 0) + 1
+
+    def error(self, label: str, kind: str):
+        counts = self.errors.setdefault(label, {})
+        counts[kind] = counts.get(kind, 0) + 1
+
+
+async def timed(rec: Recorder, conn: HTTPConnection, label: str, method: str, path: str, **kwargs):
+    started = time.perf_counter()
+    try:
+        status, headers, body = await asyncio.wait_for(
+            conn.request(method, path, **kwargs), REQUEST_TIMEOUT
+        )
+    except asyncio.TimeoutError:
+        conn.close()
+        rec.error(label, "timeout")
+        return None
+    except Exception as e:
+        conn.close()
+        rec.error(label, type(e).__name__)
+        return None
+    rec.ok(label, status, time.perf_counter() - started)
+    return status, headers, body
+
+
+# ─────────────────────────────────────────────
+#  가상 사용자
+# ─────────────────────────────────────────────
+async def browser(rec, host, port, args, stop: asyncio.Event):
+    conn  = HTTPConnection(host, port)
+    etag  = None
+    await asyncio.sleep(random.uniform(0, args.ramp))
+
+    async def load_all(label):
+        nonlocal etag
+        resp = await timed(rec, conn, label, "GET", "/api/dashboard",
+                           headers={"If-None-Match": etag} if etag else None)
+        if resp and resp[0] == 200:
+            etag = resp[1].get("etag", etag)
+
+    resp = await timed(rec, conn, "GET /", "GET", "/")
+    if resp and resp[0] == 200:
+        await load_all("GET /api/dashboard")   # 첫 화면 이후 ETag 확보
+
+    wakeup = asyncio.Event()
+    sse_task = asyncio.create_task(sse_listener(rec, host, port, wakeup, stop)) if args.sse else None
+    try:
+        while not stop.is_set():
+            try:
+                await asyncio.wait_for(wakeup.wait(), args.interval * random.uniform(0.9, 1.1))
+                wakeup.clear()
+                await load_all("GET /api/dashboard (SSE)")
+            except asyncio.TimeoutError:
+                await load_all("GET /api/dashboard (poll)")
+    finally:
+        if sse_task:
+            sse_task.cancel()
+        conn.close()
+
+
+async def sse_listener(rec, host, port, wakeup: asyncio.Event, stop: asyncio.Event):
+    while not stop.is_set():
+        conn = HTTPConnection(host, port)
+        try:
+            rec.sse["connected"] += 1
+            async for text in conn.stream("/api/events"):
+                if "event: change" in text:
+                    rec.sse["change_events"] += 1
+                    wakeup.set()
+        except asyncio.CancelledError:
+            conn.close()
+            raise
+        except Exception:
+            pass
+        rec.sse["disconnects"] += 1
+        conn.close()
+        await asyncio.sleep(3)   # EventSource 기본 재연결 대기 (retry: 3000)
+
+
+async def admin(rec, host, port, args, stop: asyncio.Event):
+    conn = HTTPConnection(host, port)
+    await timed(rec, conn, "POST /api/login", "POST", "/api/login", json_body={"password": args.admin_password})
+    while not stop.is_set():
+        await asyncio.sleep(args.admin_interval * random.uniform(0.5, 1.5))
+        today = time.strftime("%Y-%m-%d")
+        body  = {"asset_market": "KOSPI", "mention_date": today, "mention_price": 2500, "direction": "UP"}
+        await timed(rec, conn, "POST /api/predictions", "POST", "/api/predictions", json_body=body)
+        resp = await timed(rec, conn, "GET /api/predictions", "GET", "/api/predictions")
+        if not resp or resp[0] != 200:
+            continue
+        mine = [p["id"] for p in json.loads(resp[2])["predictions"] if p["mention_price"] == 2500]
+        if not mine:
+            continue
+        pid = mine[0]
+        await timed(rec, conn, "PUT /api/predictions/<id>", "PUT", f"/api/predictions/{pid}",
+                    json_body={**body, "direction": "DOWN"})
+        await timed(rec, conn, "POST /api/predictions/<id>/result", "POST",
+                    f"/api/predictions/{pid}/result", json_body={"hit": 1})
+        await timed(rec, conn, "DELETE /api/predictions/<id>", "DELETE", f"/api/predictions/{pid}")
+    conn.close()
+
+
+async def refresher(rec, host, port, args, stop: asyncio.Event):
+    conn = HTTPConnection(host, port)
+    await timed(rec, conn, "POST /api/login", "POST", "/api/login", json_body={"password": args.admin_password})
+    while not stop.is_set():
+        await asyncio.sleep(args.refresh_interval * random.uniform(0.8, 1.2))
+        await timed(rec, conn, "POST /api/refresh", "POST", "/api/refresh")
+    conn.close()
+
+
+async def run_load(host: str, port: int, args) -> tuple:
+    rec  = Recorder()
+    stop = asyncio.Event()
+    tasks  = [asyncio.create_task(browser(rec, host, port, args, stop)) for _ in range(args.browsers)]
+    tasks += [asyncio.create_task(admin(rec, host, port, args, stop)) for _ in range(args.admins)]
+    if args.refresh_interval > 0:
+        tasks.append(asyncio.create_task(refresher(rec, host, port, args, stop)))
+    started = time.perf_counter()
+    await asyncio.sleep(args.duration)
+    stop.set()
+    await asyncio.sleep(0)
+    for t in tasks:
+        t.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    return rec, time.perf_counter() - started
+
+
+# ─────────────────────────────────────────────
+#  서버 기동 / 결과 정리
+# ─────────────────────────────────────────────
+def _wait_healthy(url: str, timeout: float = 120):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with urllib.request.urlopen(url + "/health", timeout=2) as r:
+                if r.status == 200:
+                    return
+        except OSError:
+            pass
+        time.sleep(0.5)
+    raise RuntimeError("서버가 시작되지 않았습니다")
+
+
+def start_server(args, port: int, stats_dir: str):
+    db_path = os.path.join(args.data_dir, f"bench_{args.size}_{args.years}y_200.db")
+    env = dict(
+        os.environ,
+        DATABASE_PATH=db_path,
+        BACKGROUND_ROLE="web",
+        BENCH_STATS_DIR=stats_dir,
+        BENCH_PRICE_LATENCY=str(args.price_latency),
+        WEB_CONCURRENCY=str(args.workers),
+        GUNICORN_THREADS=str(args.threads),
+        ADMIN_PASSWORD=args.admin_password,
+    )
+    os.makedirs(args.data_dir, exist_ok=True)
+    subprocess.run(
+        [sys.executable, "-m", "bench.dataset", "--size", str(args.size), "--years", str(args.years)],
+        cwd=ROOT, env=env, check=True,
+    )
+    log = open(os.path.join(stats_dir, "gunicorn.log"), "w")
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "bench.stub_app:app", "-c", "gunicorn.conf.py",
+         "--bind", f"127.0.0.1:{port}", "--access-logfile", "/dev/null"],
+        cwd=ROOT, env=env, stdout=log, stderr=subprocess.STDOUT,
+    )
+    return proc, log
+
+
+def _server_stats(stats_dir: str) -> dict:
+    total = {"workers_reporting": 0, "lock_errors": 0, "server_errors": 0}
+    for path in glob.glob(os.path.join(stats_dir, "*.json")):
+        with open(path) as f:
+            s = json.load(f)
+        total["workers_reporting"] += 1
+        total["lock_errors"]   += s["lock_errors"]
+        total["server_errors"] += s["server_errors"]
+    return total
+
+
+def report(rec: Recorder, elapsed: float, args, server: dict) -> str:
+    total_ok  = sum(len(v) for v in rec.latency.values())
+    total_err = sum(sum(v.values()) for v in rec.errors.values())
+    non_2xx   = sum(n for counts in rec.statuses.values() for code, n in counts.items() if code >= 500)
+    lines = [
+        f"── 부하 테스트: 브라우저 {args.browsers} (loadAll {args.interval}s 주기"
+        f"{', SSE' if args.sse else ''}), 관리자 {args.admins}, 갱신 {args.refresh_interval}s, "
+        f"워커 {args.workers}×{args.threads} 스레드, 예측 {args.size:,}건 " + "─" * 10,
+        f"처리량: {total_ok / elapsed:.1f} req/s  (응답 {total_ok:,}건 / {elapsed:.0f}s)",
+        f"오류율: {(total_err + non_2xx) / max(1, total_ok + total_err) * 100:.2f}%  "
+        f"(연결·타임아웃 {total_err}, 5xx {non_2xx})",
+        f"SQLite 잠금 오류: {server.get('lock_errors', '?')}  "
+        f"(서버 5xx {server.get('server_errors', '?')}, 보고한 워커 {server.get('workers_reporting', 0)})",
+    ]
+    if args.sse:
+        lines.append(f"SSE: 연결 {rec.sse['connected']}, change 이벤트 {rec.sse['change_events']}, "
+                     f"끊김 {rec.sse['disconnects']}")
+    lines.append("")
+    lines.append(f"{'대상':<36} {'n':>7} {'p50(ms)':>9} {'p95(ms)':>9} {'p99(ms)':>9} {'max(ms)':>9}  상태/오류")
+    for label in sorted(set(rec.latency) | set(rec.errors)):
+        samples = rec.latency.get(label) or [0]
+        status  = ", ".join(f"{k}×{v}" for k, v in sorted(rec.statuses.get(label, {}).items()))
+        errors  = ", ".join(f"{k}×{v}" for k, v in rec.errors.get(label, {}).items())
+        lines.append(
+            f"{label:<36} {len(rec.latency.get(label, [])):>7} "
+            f"{percentile(samples, .5) * 1000:>9.1f} {percentile(samples, .95) * 1000:>9.1f} "
+            f"{percentile(samples, .99) * 1000:>9.1f} {max(samples) * 1000:>9.1f}  "
+            + "  ".join(x for x in (status, errors) if x)
+        )
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="알감자지수 부하 테스트 (asyncio)")
+    parser.add_argument("--browsers", type=int, default=100, help="동시 가상 브라우저 수")
+    parser.add_argument("--duration", type=float, default=120, help="측정 시간(초)")
+    parser.add_argument("--ramp", type=float, default=10, help="브라우저 접속을 분산할 시간(초)")
+    parser.add_argument("--interval", type=float, default=60, help="브라우저별 loadAll 주기(초)")
+    parser.add_argument("--sse", action="store_true", help="브라우저마다 /api/events 구독 유지")
+    parser.add_argument("--admins", type=int, default=1, help="쓰기 작업을 반복하는 관리자 수")
+    parser.add_argument("--admin-interval", type=float, default=10, help="관리자 쓰기 주기(초)")
+    parser.add_argument("--refresh-interval", type=float, default=30, help="/api/refresh 주기(초), 0이면 끔")
+    parser.add_argument("--admin-password", default=os.environ.get("ADMIN_PASSWORD", "bench-admin"))
+    parser.add_argument("--url", help="이미 실행 중인 서버 주소 (주면 gunicorn을 띄우지 않음)")
+    parser.add_argument("--workers", type=int, default=int(os.environ.get("WEB_CONCURRENCY", "2")))
+    parser.add_argument("--threads", type=int, default=int(os.environ.get("GUNICORN_THREADS", "32")))
+    parser.add_argument("--port", type=int, default=18000)
+    parser.add_argument("--size", type=int, default=1000, help="합성 DB 예측 건수")
+    parser.add_argument("--years", type=int, default=3, help="합성 DB 이력 기간(년)")
+    parser.add_argument("--price-latency", type=float, default=0.2, help="가격 조회 대역 지연(초)")
+    parser.add_argument("--data-dir", default=os.path.join(tempfile.gettempdir(), "algamja_bench"))
+    parser.add_argument("--out", help="결과 요약을 저장할 파일")
+    args = parser.parse_args(argv)
+
+    stats_dir = tempfile.mkdtemp(prefix="algamja_load_")
+    proc = log = None
+    if args.url:
+        target = args.url.rstrip("/")
+    else:
+        target = f"http://127.0.0.1:{args.port}"
+        proc, log = start_server(args, args.port, stats_dir)
+    try:
+        _wait_healthy(target)
+        parts = urlsplit(target)
+        print(f"[load] {target} 대상 {args.duration:.0f}초 측정 시작", flush=True)
+        rec, elapsed = asyncio.run(run_load(parts.hostname, parts.port or 80, args))
+    finally:
+        if proc:
+            proc.send_signal(signal.SIGTERM)
+            proc.wait(timeout=30)
+            log.close()
+    server = _server_stats(stats_dir) if proc else {}
+    text = report(rec, elapsed, args, server)
+    print("\n" + text)
+    if proc:
+        print(f"\n[load] gunicorn 로그: {os.path.join(stats_dir, 'gunicorn.log')}")
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""
+부하 테스트용 WSGI 진입점 - 외부 서비스를 대역으로 바꾼 app
+  gunicorn bench.stub_app:app -c gunicorn.conf.py
+
+환경변수:
+  BENCH_PRICE_LATENCY / BENCH_SEARCH_LATENCY / BENCH_TELEGRAM_LATENCY  대역 지연(초)
+  BENCH_STATS_DIR  워커별 SQLite 잠금 오류 집계 파일(<pid>.json)을 남길 디렉토리
+"""
+import json
+import os
+import sqlite3
+import threading
+
+import app as app_module
+from bench import stubs
+
+stubs.install(
+    float(os.environ.get("BENCH_PRICE_LATENCY", "0")),
+    float(os.environ.get("BENCH_SEARCH_LATENCY", "0")),
+    float(os.environ.get("BENCH_TELEGRAM_LATENCY", "0")),
+)
+
+app = app_module.app
+
+STATS_DIR = os.environ.get("BENCH_STATS_DIR")
+
+_lock  = threading.Lock()
+_stats = {"pid": os.getpid(), "lock_errors": 0, "server_errors": 0}
+
+
+def _flush():
+    if STATS_DIR:
+        with open(os.path.join(STATS_DIR, f"{os.getpid()}.json"), "w") as f:
+            json.dump(_stats, f)
+
+
+def _record(key: str):
+    with _lock:
+        _stats[key] += 1
+        _flush()
+
+
+_flush()  # 오류가 없어도 워커가 집계에 잡히도록 시작 시 0으로 기록
+
+
+def _is_lock_error(text: str) -> bool:
+    return "database is locked" in text or "database is busy" in text
+
+
+@app.errorhandler(sqlite3.OperationalError)
+def _operational_error(e):
+    return {"error": str(e)}, 500   # 메시지를 본문에 남겨 아래에서 잠금 오류로 집계
+
+
+@app.after_request
+def _count_errors(response):
+    # 라우트 안에서 예외를 잡아 {"error": ...} 500 으로 돌려주는 경우도 같은 방식으로 집계
+    if response.status_code >= 500:
+        _record("server_errors")
+        if not response.is_streamed and _is_lock_error(response.get_data(as_text=True)):
+            _record("lock_errors")
+    return response
@@ -0,0 +1,77 @@
+"""
+외부 서비스 대역 - 네트워크 없이 고정 지연 후 결정적인 값 반환
+가격은 심볼 CRC로 정한 기준가에 호출 횟수만큼의 작은 변화를 더해 매 사이클 값이 바뀌도록 함
+routes.py 는 함수를 이름으로 import 하므로 app import 이후에 install() 해야 함
+"""
+import time
+import zlib
+
+latency = {"price": 0.0, "search": 0.0, "telegram": 0.0}
+calls   = {"price": 0, "search": 0, "telegram": 0}
+_tick   = {"n": 0}
+
+
+def _wait(kind: str):
+    calls[kind] += 1
+    if latency[kind]:
+        time.sleep(latency[kind])
+
+
+def _price_for(symbol: str) -> float:
+    base = 10 + zlib.crc32(symbol.encode()) % 100_000
+    return round(base * (1 + 0.001 * (_tick["n"] % 7 - 3)), 2)
+
+
+def fetch_price(asset: str):
+    _wait("price")
+    return _price_for(asset)
+
+
+def _yfinance_price(symbol: str):
+    _wait("price")
+    return _price_for(symbol)
+
+
+def _yfinance_batch(chunk: list) -> dict:
+    _wait("price")
+    _tick["n"] += 1
+    return {symbol: _price_for(symbol) for symbol in chunk}
+
+
+def _hedged_price(symbol: str):
+    _wait("price")
+    return _price_for(symbol)
+
+
+def search_ticker_by_name(query: str, suffix: str = '') -> list:
+    _wait("search")
+    code = f"{zlib.crc32(query.encode()) % 1_000_000:06d}"
+    return [{"ticker": code + (suffix or ".KS"), "name": query, "exchange": "KOSPI"}]
+
+
+def validate_ticker(ticker: str) -> dict:
+    _wait("search")
+    return {"valid": True, "price": _price_for(ticker), "exchange": "BENCH"}
+
+
+def _send_message(token: str, channel: str, text: str, parse_mode: str = None) -> bool:
+    _wait("telegram")
+    return True
+
+
+def install(price_latency: float = 0.0, search_latency: float = 0.0, telegram_latency: float = 0.0):
+    """prices / routes / telegram_bot 의 외부 호출 함수를 대역으로 교체"""
+    import prices
+    import routes
+    import telegram_bot
+
+    latency.update(price=price_latency, search=search_latency, telegram=telegram_latency)
+    for name in ("fetch_price", "_yfinance_price", "_yfinance_batch", "_hedged_price",
+                 "search_ticker_by_name", "validate_ticker"):
+        setattr(prices, name, globals()[name])
+    routes.search_ticker_by_name = search_ticker_by_name
+    routes.validate_ticker       = validate_ticker
+    telegram_bot._send_message   = _send_message
+    # 토큰이 없으면 send_telegram 이 전송 전에 빠져나가므로 더미 값으로 채움
+    telegram_bot.TELEGRAM_BOT_TOKEN  = telegram_bot.TELEGRAM_BOT_TOKEN or "bench"
+    telegram_bot.TELEGRAM_CHANNEL_ID = telegram_bot.TELEGRAM_CHANNEL_ID or "@bench"
@@ -0,0 +1,235 @@
+"""
+오프라인 벤치마크 - 합성 DB 크기별로 routes.py 엔드포인트 p50/p99 와
+update_all_prices / send_dashboard_report 사이클 시간을 측정
+
+  python -m bench.suite                                   # 1k / 100k 예측, 기본 설정
+  python -m bench.suite --sizes 1000,100000,1000000 --years 5 --price-latency 0.2 --out bench_output.txt
+
+크기마다 별도 프로세스에서 실행 (database 모듈이 import 시점의 DATABASE_PATH 를 쓰기 때문)
+합성 DB는 --data-dir 에 캐시되어 같은 파라미터로 다시 돌리면 재사용
+"""
+import argparse
+import json
+import math
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULT_PREFIX = "BENCH_RESULT "
+
+
+def percentile(samples: list, q: float) -> float:
+    ordered = sorted(samples)
+    return ordered[max(0, min(len(ordered) - 1, math.ceil(q * len(ordered)) - 1))]
+
+
+def _summary(samples: list) -> dict:
+    return {
+        "n":   len(samples),
+        "p50": percentile(samples, 0.50) * 1000,
+        "p99": percentile(samples, 0.99) * 1000,
+        "max": max(samples) * 1000,
+    }
+
+
+# ─────────────────────────────────────────────
+#  측정 (자식 프로세스)
+# ─────────────────────────────────────────────
+def _measure(fn, iterations: int, warmup: int = 2) -> dict:
+    for _ in range(warmup):
+        fn()
+    samples = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - started)
+    return _summary(samples)
+
+
+def _wait_jobs_idle(timeout: float = 120):
+    import jobs
+
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        with jobs._lock:   # 임대 획득 전 틈까지 보려면 프로세스 내부 상태를 직접 확인
+            busy = any(j["running"] for j in jobs._jobs.values())
+        if not busy:
+            return
+        time.sleep(0.01)
+
+
+def _check(resp, *expected):
+    if resp.status_code not in (expected or (200,)):
+        raise RuntimeError(f"{resp.request.method} {resp.request.path} → {resp.status_code}")
+    return resp
+
+
+def run_child(args) -> dict:
+    from bench import dataset
+
+    dataset.build(args.size, args.years, args.custom_assets)
+
+    import app as app_module
+    from bench import stubs
+    from prices import update_all_prices
+    from telegram_bot import send_dashboard_report
+    from settings import ADMIN_PASSWORD
+    from database import get_db
+
+    stubs.install(args.price_latency, args.search_latency, args.telegram_latency)
+    visitor = app_module.app.test_client()
+    admin   = app_module.app.test_client()
+    _check(admin.post("/api/login", json={"password": ADMIN_PASSWORD}))
+
+    n = args.iterations
+    results = {}
+
+    def bench(label, fn, iterations=n):
+        results[label] = _measure(fn, iterations)
+        r = results[label]
+        print(f"  {label:<44} p50 {r['p50']:8.2f}ms  p99 {r['p99']:8.2f}ms", flush=True)
+
+    # 1) 조회 엔드포인트 (방문자)
+    etag = _check(visitor.get("/api/dashboard")).headers.get("ETag")
+    reads = [
+        ("GET /health",                            "/health"),
+        ("GET /",                                  "/"),
+        ("GET /api/dashboard",                     "/api/dashboard"),
+        ("GET /api/predictions",                   "/api/predictions"),
+        ("GET /api/asset-stats",                   "/api/asset-stats"),
+        ("GET /api/daily-index",                   "/api/daily-index"),
+        ("GET /api/settings",                      "/api/settings"),
+        ("GET /api/price-history 1w raw",          "/api/price-history?asset=KOSPI&range=1w"),
+        ("GET /api/price-history all 1d",          "/api/price-history?asset=KOSPI&range=all&resolution=1d"),
+        ("GET /api/search-ticker-name",            "/api/search-ticker-name?q=%EC%82%BC%EC%84%B1&suffix=.KS"),
+        ("GET /api/auth-status",                   "/api/auth-status"),
+    ]
+    for label, url in reads:
+        bench(label, lambda url=url: _check(visitor.get(url)))
+    bench("GET /api/dashboard (304)",
+          lambda: _check(visitor.get("/api/dashboard", headers={"If-None-Match": etag}), 304))
+    bench("GET /api/cache-stats (admin)", lambda: _check(admin.get("/api/cache-stats")))
+    bench("GET /api/jobs (admin)",        lambda: _check(admin.get("/api/jobs")))
+
+    # 2) 쓰기 엔드포인트 (관리자) — 추가 → 수정 → 결과 → 삭제 순환
+    created = []
+
+    def add():
+        _check(admin.post("/api/predictions", json={
+            "asset_market": "KOSPI", "mention_date": time.strftime("%Y-%m-%d"),
+            "mention_price": 2500, "direction": "UP",
+        }))
+        conn = get_db()
+        try:
+            created.append(conn.execute("SELECT MAX(id) FROM predictions").fetchone()[0])
+        finally:
+            conn.close()
+
+    bench("POST /api/validate-ticker", lambda: _check(admin.post("/api/validate-ticker", json={"ticker": "AAPL"})))
+    bench("POST /api/predictions", add)
+    ids = iter(list(created) * 3)
+    bench("PUT /api/predictions/<id>", lambda: _check(admin.put(f"/api/predictions/{next(ids)}", json={
+        "asset_market": "KOSPI", "mention_date": time.strftime("%Y-%m-%d"),
+        "mention_price": 2600, "direction": "DOWN",
+    })), iterations=min(n, len(created)) - 2)
+    ids = iter(list(created) * 3)
+    bench("POST /api/predictions/<id>/result",
+          lambda: _check(admin.post(f"/api/predictions/{next(ids)}/result", json={"hit": 1})),
+          iterations=min(n, len(created)) - 2)
+    ids = iter(created)
+    bench("DELETE /api/predictions/<id>",
+          lambda: _check(admin.delete(f"/api/predictions/{next(ids)}")),
+          iterations=len(created) - 2)
+    bench("POST /api/settings",
+          lambda: _check(admin.post("/api/settings", json={"update_interval": "5"})))
+
+    # 3) 백그라운드 작업을 띄우는 엔드포인트 — 요청부터 작업 완료까지
+    bench("POST /api/refresh (완료까지)",
+          lambda: (_check(admin.post("/api/refresh")), _wait_jobs_idle()), iterations=3)
+    bench("POST /api/send-report (완료까지)",
+          lambda: (_check(admin.post("/api/send-report")), _wait_jobs_idle()), iterations=3)
+
+    # 4) 사이클 시간
+    bench("cycle update_all_prices", update_all_prices, iterations=args.cycles)
+    bench("cycle send_dashboard_report(force)", lambda: send_dashboard_report(force=True), iterations=args.cycles)
+
+    return {"size": args.size, "years": args.years, "results": results, "stub_calls": dict(stubs.calls)}
+
+
+# ─────────────────────────────────────────────
+#  오케스트레이션 (부모 프로세스)
+# ─────────────────────────────────────────────
+def _format(report: dict) -> str:
+    lines = [
+        f"── 예측 {report['size']:,}건 / {report['years']}년치 이력 " + "─" * 30,
+        f"{'대상':<44} {'n':>4} {'p50(ms)':>10} {'p99(ms)':>10} {'max(ms)':>10}",
+    ]
+    for label, r in report["results"].items():
+        lines.append(f"{label:<44} {r['n']:>4} {r['p50']:>10.2f} {r['p99']:>10.2f} {r['max']:>10.2f}")
+    lines.append(f"대역 호출 수: {report['stub_calls']}")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="알감자지수 오프라인 벤치마크")
+    parser.add_argument("--sizes", default="1000,100000", help="예측 건수 목록 (쉼표 구분)")
+    parser.add_argument("--years", type=int, default=3, help="가격 이력 / daily_index 기간(년)")
+    parser.add_argument("--custom-assets", type=int, default=200, help="합성 개별종목 수")
+    parser.add_argument("--iterations", type=int, default=50, help="엔드포인트별 측정 횟수")
+    parser.add_argument("--cycles", type=int, default=5, help="갱신·리포트 사이클 측정 횟수")
+    parser.add_argument("--price-latency", type=float, default=0.0, help="가격 조회 대역 지연(초)")
+    parser.add_argument("--search-latency", type=float, default=0.0, help="티커 검색·검증 대역 지연(초)")
+    parser.add_argument("--telegram-latency", type=float, default=0.0, help="텔레그램 전송 대역 지연(초)")
+    parser.add_argument("--data-dir", default=os.path.join(tempfile.gettempdir(), "algamja_bench"))
+    parser.add_argument("--out", help="결과 요약을 저장할 파일 (예: bench_output.txt)")
+    parser.add_argument("--size", type=int, help=argparse.SUPPRESS)           # 자식 프로세스용
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        report = run_child(args)
+        print(RESULT_PREFIX + json.dumps(report, ensure_ascii=False), flush=True)
+        return
+
+    os.makedirs(args.data_dir, exist_ok=True)
+    forwarded = [
+        "--years", str(args.years), "--custom-assets", str(args.custom_assets),
+        "--iterations", str(args.iterations), "--cycles", str(args.cycles),
+        "--price-latency", str(args.price_latency), "--search-latency", str(args.search_latency),
+        "--telegram-latency", str(args.telegram_latency),
+    ]
+    reports = []
+    for size in (int(s) for s in args.sizes.split(",") if s.strip()):
+        db_path = os.path.join(args.data_dir, f"bench_{size}_{args.years}y_{args.custom_assets}.db")
+        env = dict(
+            os.environ,
+            DATABASE_PATH=db_path,
+            BACKGROUND_ROLE="web",      # 스케줄러·봇 없이 요청 경로만 측정
+            KRX_DATA_DIR=os.environ.get("KRX_DATA_DIR", os.path.join(ROOT, "data")),
+        )
+        print(f"[bench] 예측 {size:,}건 → {db_path}", flush=True)
+        proc = subprocess.run(
+            [sys.executable, "-m", "bench.suite", "--child", "--size", str(size), *forwarded],
+            cwd=ROOT, env=env, stdout=subprocess.PIPE, text=True,
+        )
+        for line in proc.stdout.splitlines():
+            if line.startswith(RESULT_PREFIX):
+                reports.append(json.loads(line[len(RESULT_PREFIX):]))
+            else:
+                print(line)
+        if proc.returncode != 0:
+            print(f"[bench] ❌ 예측 {size:,}건 실행 실패 (exit {proc.returncode})")
+
+    text = "\n\n".join(_format(r) for r in reports)
+    print("\n" + text)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+        print(f"\n[bench] 결과 저장: {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+"""
+조회 결과 캐시 모듈 - 항목별 TTL + LRU, 실패 결과(negative)도 짧게 캐시
+티커 검색(search_ticker_by_name)·티커 검증(validate_ticker) 앞단에서 같은 질의의
+반복 외부 호출을 막고, 내용은 SQLite lookup_cache 테이블에 저장해 재시작 후에도 유지
+"""
+import json
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+
+from database import get_db
+
+_caches = {}  # 이름 → TTLCache (통계 조회용)
+
+
+class TTLCache:
+    """
+    크기 제한 LRU + 항목별 만료 시각.
+    처음 조회할 때 DB에서 만료되지 않은 항목을 불러오고, 이후 set/퇴출은 DB에 바로 반영.
+    """
+
+    def __init__(self, name: str, maxsize: int, ttl: float, negative_ttl: float):
+        self.name         = name
+        self.maxsize      = maxsize
+        self.ttl          = ttl
+        self.negative_ttl = negative_ttl
+        self.hits = self.misses = self.negative_hits = 0
+        self._data   = OrderedDict()   # key → (expires_at, negative, value)
+        self._lock   = threading.Lock()
+        self._loaded = False
+        _caches[name] = self
+
+    # ── 영속화 ─────────────────────────────────
+    def _load(self):
+        conn = get_db()
+        try:
+            now = time.time()
+            conn.execute("DELETE FROM lookup_cache WHERE namespace=? AND expires_at<=?", (self.name, now))
+            rows = conn.execute(
+                """SELECT key, value, negative, expires_at FROM lookup_cache
+                   WHERE namespace=? ORDER BY expires_at DESC LIMIT ?""",
+                (self.name, self.maxsize),
+            ).fetchall()
+            conn.commit()
+            for r in reversed(rows):
+                self._data[r["key"]] = (r["expires_at"], bool(r["negative"]), json.loads(r["value"]))
+        except Exception as e:
+            print(f"[cache:{self.name}] 불러오기 실패: {e}")
+        finally:
+            conn.close()
+        self._loaded = True
+
+    def _persist(self, key, entry, evicted):
+        conn = get_db()
+        try:
+            expires_at, negative, value = entry
+            conn.execute(
+                """INSERT OR REPLACE INTO lookup_cache (namespace, key, value, negative, expires_at)
+                   VALUES (?,?,?,?,?)""",
+                (self.name, key, json.dumps(value, ensure_ascii=False), int(negative), expires_at),
+            )
+            conn.executemany(
+                "DELETE FROM lookup_cache WHERE namespace=? AND key=?",
+                [(self.name, k) for k in evicted],
+            )
+            conn.commit()
+        except Exception as e:
+            print(f"[cache:{self.name}] 저장 실패: {e}")
+        finally:
+            conn.close()
+
+    # ── 조회 / 저장 ─────────────────────────────
+    def get(self, key: str):
+        """→ (hit 여부, 값)"""
+        with self._lock:
+            if not self._loaded:
+                self._load()
+            entry = self._data.get(key)
+            if entry is None or entry[0] <= time.time():
+                if entry is not None:
+                    del self._data[key]
+                self.misses += 1
+                return False, None
+            self._data.move_to_end(key)
+            self.hits += 1
+            if entry[1]:
+                self.negative_hits += 1
+            return True, entry[2]
+
+    def set(self, key: str, value, negative: bool = False):
+        ttl   = self.negative_ttl if negative else self.ttl
+        entry = (time.time() + ttl, negative, value)
+        evicted = []
+        with self._lock:
+            self._data[key] = entry
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                evicted.append(self._data.popitem(last=False)[0])
+        self._persist(key, entry, evicted)
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "size":          len(self._data),
+            "maxsize":       self.maxsize,
+            "hits":          self.hits,
+            "misses":        self.misses,
+            "negative_hits": self.negative_hits,
+            "hit_rate":      round(self.hits / total * 100, 1) if total else 0,
+        }
+
+
+class Uncached:
+    """
+    cached 함수가 결과를 이것으로 감싸 반환하면 저장하지 않고 값만 돌려줌
+    네트워크 오류 등 일시적 실패로 만든 결과가 negative 캐시로 남아 정상 티커를 무효로 보이게 하지 않도록
+    """
+    __slots__ = ("value",)
+
+    def __init__(self, value):
+        self.value = value
+
+
+def cached(cache: TTLCache, is_negative=lambda v: not v, key=None):
+    """
+    함수 결과를 cache에 저장하는 데코레이터
+    is_negative(결과) 가 참이면 negative_ttl 로 짧게 저장, key(*args)로 캐시 키 정규화
+    Uncached(값) 반환은 저장하지 않음
+    """
+    def decorator(f):
+        @wraps(f)
+        def wrapper(*args):
+            k = json.dumps(key(*args) if key else args, ensure_ascii=False)
+            hit, value = cache.get(k)
+            if hit:
+                return value
+            value = f(*args)
+            if isinstance(value, Uncached):
+                return value.value
+            cache.set(k, value, negative=is_negative(value))
+            return value
+        wrapper.cache = cache
+        return wrapper
+    return decorator
+
+
+def cache_stats() -> dict:
+    return {name: c.stats() for name, c in _caches.items()}
@@ -0,0 +1,106 @@
+"""
+서킷 브레이커 모듈 - 가격 공급자(yfinance, CoinGecko)별 장애 차단
+연속 CIRCUIT_FAILURE_THRESHOLD 회 실패하면 CIRCUIT_COOLDOWN 동안 호출 없이 바로 실패(open)
+→ 쿨다운이 지나면 다음 갱신 사이클에서 한 건만 시험 호출(half_open)
+→ 성공하면 정상(closed)으로 복귀, 실패하면 다시 쿨다운
+차단된 동안 해당 자산은 마지막 가격을 유지하고 prices.stale_since 로 지연 표시
+상태는 갱신을 실행하는 프로세스 메모리에 있으므로 사이클마다 app_meta 에 스냅샷을 남겨
+어느 웹 워커의 /api/jobs 에서든 보이게 함 (metrics 의 algamja_circuit_open 게이지도 같은 시점에 기록)
+"""
+import json
+import threading
+import time
+
+import metrics
+from database import get_meta, set_meta
+from settings import CIRCUIT_FAILURE_THRESHOLD, CIRCUIT_COOLDOWN
+
+META_KEY = "circuits"
+
+CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+_lock     = threading.Lock()
+_circuits = {}  # 공급자 → 상태 dict
+
+
+def _circuit(provider: str) -> dict:
+    return _circuits.setdefault(provider, {
+        "state": CLOSED, "failures": 0, "opened_at": None,
+        "trips": 0, "short_circuited": 0, "last_error": None,
+    })
+
+
+def allow(provider: str) -> bool:
+    """이번 호출을 보내도 되는지 — open이면 False, 쿨다운이 끝났으면 시험 호출 1건만 True"""
+    with _lock:
+        c = _circuit(provider)
+        if c["state"] == CLOSED:
+            return True
+        if c["state"] == OPEN and time.monotonic() - c["opened_at"] >= CIRCUIT_COOLDOWN:
+            c["state"] = HALF_OPEN
+            print(f"[circuit] {provider}: 쿨다운 종료 → 시험 호출")
+            return True
+        c["short_circuited"] += 1
+        return False
+
+
+def record_success(provider: str):
+    with _lock:
+        c = _circuit(provider)
+        if c["state"] != CLOSED:
+            print(f"[circuit] {provider}: 복구 → 정상")
+        c.update(state=CLOSED, failures=0, opened_at=None)
+
+
+def record_failure(provider: str, error=None):
+    with _lock:
+        c = _circuit(provider)
+        c["failures"]  += 1
+        c["last_error"] = str(error) if error else None
+        if c["state"] == HALF_OPEN or (c["state"] == CLOSED and c["failures"] >= CIRCUIT_FAILURE_THRESHOLD):
+            c.update(state=OPEN, opened_at=time.monotonic())
+            c["trips"] += 1
+            print(f"[circuit] {provider}: 연속 {c['failures']}회 실패 → {CIRCUIT_COOLDOWN:.0f}초 차단")
+
+
+def cancel_probe(provider: str):
+    """시험 호출 결과로 판단할 수 없었을 때(처음 보는 심볼만 조회) → 다음 사이클에 다시 시험 호출"""
+    with _lock:
+        c = _circuit(provider)
+        if c["state"] == HALF_OPEN:
+            c["state"] = OPEN  # opened_at 유지 → 쿨다운은 이미 지난 상태
+
+
+def status() -> dict:
+    """{공급자: {state, failures, retry_in, trips, short_circuited, last_error}}"""
+    with _lock:
+        now = time.monotonic()
+        return {
+            provider: {
+                "state":           c["state"],
+                "failures":        c["failures"],
+                "retry_in":        max(0, round(c["opened_at"] + CIRCUIT_COOLDOWN - now)) if c["state"] == OPEN else 0,
+                "trips":           c["trips"],
+                "short_circuited": c["short_circuited"],
+                "last_error":      c["last_error"],
+            }
+            for provider, c in _circuits.items()
+        }
+
+
+def save_snapshot(conn):
+    """현재 상태를 app_meta 에 기록 + 게이지 갱신 (commit은 호출자 책임)"""
+    current = status()
+    set_meta(conn, META_KEY, json.dumps({"saved_at": time.time(), "providers": current}, ensure_ascii=False))
+    for provider, c in current.items():
+        metrics.CIRCUIT_OPEN.set(int(c["state"] != CLOSED), provider)
+
+
+def load_snapshot(conn) -> dict:
+    """마지막 스냅샷 → status() 형식 (retry_in 은 저장 이후 흐른 시간만큼 차감)"""
+    snapshot = json.loads(get_meta(conn, META_KEY, "{}"))
+    elapsed  = time.time() - snapshot.get("saved_at", time.time())
+    providers = snapshot.get("providers", {})
+    for c in providers.values():
+        c["retry_in"] = max(0, round(c["retry_in"] - elapsed))
+    return providers
@@ -3,8 +3,13 @@
 """
 import os
 import sqlite3
+import threading
+import time
 from datetime import date
 
+import metrics
+import profiling
+
 
 def _resolve_db_path():
     """DATABASE_PATH 환경변수 → 쓰기 가능 여부 확인 → 불가 시 앱 디렉토리 대체"""
@@ -26,14 +31,103 @@ def _resolve_db_path():
 DATABASE = _resolve_db_path()
 
 
-def get_db():
-    conn = sqlite3.connect(DATABASE)
+# ─────────────────────────────────────────────
+#  스레드별 커넥션 풀
+#  요청/스케줄러/봇 스레드마다 커넥션 하나를 열어 두고 재사용.
+#  WAL 모드라 읽기는 백그라운드 가격 쓰기와 서로 막지 않고,
+#  busy_timeout 동안은 'database is locked' 대신 대기.
+# ─────────────────────────────────────────────
+BUSY_TIMEOUT_MS = 5000
+
+_PRAGMAS = (
+    f"PRAGMA busy_timeout={BUSY_TIMEOUT_MS}",
+    "PRAGMA synchronous=NORMAL",    # WAL에서는 NORMAL로도 커밋 내구성 충분
+    "PRAGMA cache_size=-16000",     # 페이지 캐시 16MB
+    "PRAGMA mmap_size=134217728",   # 128MB 메모리 맵 읽기
+    "PRAGMA temp_store=MEMORY",
+)
+
+_local = threading.local()
+
+
+def _statement_kind(sql: str) -> str:
+    """메트릭 라벨용 문장 종류 (SELECT / INSERT / UPDATE / ...)"""
+    head = sql.lstrip()[:10].split(None, 1)
+    return head[0].upper() if head else "?"
+
+
+def _record_query(sql: str, elapsed: float):
+    metrics.DB_QUERY.observe(elapsed, _statement_kind(sql))
+    profiling.record_query(sql, elapsed)
+
+
+class PooledConnection(sqlite3.Connection):
+    """
+    get_db()가 돌려주는 커넥션 — close()는 실제로 닫지 않고 스레드 풀에 반환.
+    같은 스레드 안에서 get_db()가 중첩 호출돼도 같은 커넥션을 공유하며,
+    마지막 사용자가 close() 할 때 커밋되지 않은 트랜잭션만 롤백 (기존 close()와 같은 의미).
+    """
+    users = 0
+
+    def execute(self, sql, parameters=()):
+        started = time.perf_counter()
+        try:
+            return super().execute(sql, parameters)
+        finally:
+            _record_query(sql, time.perf_counter() - started)
+
+    def executemany(self, sql, seq_of_parameters):
+        started = time.perf_counter()
+        try:
+            return super().executemany(sql, seq_of_parameters)
+        finally:
+            _record_query(sql, time.perf_counter() - started)
+
+    def close(self):
+        self.users = max(0, self.users - 1)
+        if self.users == 0 and self.in_transaction:
+            self.rollback()
+
+    def close_for_real(self):
+        sqlite3.Connection.close(self)
+
+
+def _connect():
+    conn = sqlite3.connect(
+        DATABASE,
+        timeout=BUSY_TIMEOUT_MS / 1000,
+        factory=PooledConnection,
+        cached_statements=256,   # 스레드별 준비된 문장(prepared statement) 캐시
+    )
     conn.row_factory = sqlite3.Row
+    for pragma in _PRAGMAS:
+        conn.execute(pragma)
     return conn
 
 
+def get_db():
+    """현재 스레드의 커넥션 반환 (없으면 새로 열어 풀에 보관) — 사용 후 close() 호출"""
+    conn = getattr(_local, "conn", None)
+    if conn is None:
+        conn = _local.conn = _connect()
+    conn.users += 1
+    return conn
+
+
+def close_db():
+    """현재 스레드의 풀 커넥션을 실제로 닫음 (스레드 종료 전 정리용)"""
+    conn = getattr(_local, "conn", None)
+    if conn is not None:
+        _local.conn = None
+        conn.close_for_real()
+
+
 def init_db():
     conn = get_db()
+    # WAL은 DB 파일에 기록되는 설정 → 초기화 때 한 번만 지정
+    mode = conn.execute("PRAGMA journal_mode=WAL").fetchone()[0]
+    if mode.lower() != "wal":
+        print(f"[db] ⚠️ WAL 모드 전환 실패 (현재: {mode})")
     conn.executescript("""
         CREATE TABLE IF NOT EXISTS predictions (
             id            INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -50,9 +144,19 @@ def init_db():
         CREATE TABLE IF NOT EXISTS prices (
             asset_market  TEXT PRIMARY KEY,
             current_price REAL,
-            updated_at    TEXT
+            updated_at    TEXT,               -- 마지막으로 가격을 받은 시각
+            stale_since   TEXT                -- 조회 실패·차단으로 지연되기 시작한 시각 (정상이면 NULL)
         );
 
+        -- 가격 시계열: 갱신마다 (자산, 시각) 한 행씩 추가
+        -- WITHOUT ROWID 기본키가 곧 (asset_market, ts) 인덱스 → 자산별 기간 조회가 범위 스캔
+        CREATE TABLE IF NOT EXISTS price_history (
+            asset_market  TEXT NOT NULL,
+            ts            TEXT NOT NULL,
+            price         REAL NOT NULL,
+            PRIMARY KEY (asset_market, ts)
+        ) WITHOUT ROWID;
+
         CREATE TABLE IF NOT EXISTS daily_index (
             id            INTEGER PRIMARY KEY AUTOINCREMENT,
             date          TEXT    UNIQUE NOT NULL,
@@ -60,30 +164,255 @@ def init_db():
             recorded_at   TEXT    DEFAULT CURRENT_TIMESTAMP
         );
 
+        -- 백그라운드 작업 메트릭 누적값 (metrics.py 공유 메트릭) — 어느 워커가 /metrics 에 응답해도 같은 값
+        CREATE TABLE IF NOT EXISTS metrics (
+            name    TEXT NOT NULL,
+            series  TEXT NOT NULL,
+            value   REAL NOT NULL,
+            PRIMARY KEY (name, series)
+        ) WITHOUT ROWID;
+
         CREATE TABLE IF NOT EXISTS settings (
             key   TEXT PRIMARY KEY,
             value TEXT NOT NULL
         );
+
+        -- 알감자지수 집계 테이블: predictions 트리거가 증감으로 유지 → 조회는 상수 시간
+        CREATE TABLE IF NOT EXISTS asset_stats (
+            asset_market  TEXT PRIMARY KEY,
+            total_hit     INTEGER NOT NULL DEFAULT 0,
+            total_miss    INTEGER NOT NULL DEFAULT 0,
+            total_count   INTEGER NOT NULL DEFAULT 0
+        );
+
+        CREATE TABLE IF NOT EXISTS index_totals (
+            id            INTEGER PRIMARY KEY CHECK (id = 1),
+            total_hit     INTEGER NOT NULL DEFAULT 0,
+            total_miss    INTEGER NOT NULL DEFAULT 0,
+            total_count   INTEGER NOT NULL DEFAULT 0
+        );
+
+        -- 내부 상태 저장용 키-값 (설정 화면에 노출되지 않는 값)
+        CREATE TABLE IF NOT EXISTS app_meta (
+            key   TEXT PRIMARY KEY,
+            value TEXT
+        );
+
+        -- 프로세스 간 임대(lease): 백그라운드 작업 리더 선출 등
+        CREATE TABLE IF NOT EXISTS leases (
+            name       TEXT PRIMARY KEY,
+            holder     TEXT NOT NULL,
+            expires_at REAL NOT NULL
+        );
+
+        -- 외부 조회 결과 캐시 (cache.py TTLCache 영속화)
+        CREATE TABLE IF NOT EXISTS lookup_cache (
+            namespace  TEXT    NOT NULL,
+            key        TEXT    NOT NULL,
+            value      TEXT    NOT NULL,
+            negative   INTEGER NOT NULL DEFAULT 0,
+            expires_at REAL    NOT NULL,
+            PRIMARY KEY (namespace, key)
+        );
+
+        -- 데이터 버전: 테이블별 변경 카운터 (ETag / 변경 감지용, 아래 트리거가 증가)
+        CREATE TABLE IF NOT EXISTS data_versions (
+            name          TEXT PRIMARY KEY,
+            version       INTEGER NOT NULL DEFAULT 0,
+            updated_at    TEXT    NOT NULL DEFAULT CURRENT_TIMESTAMP
+        );
+
+        CREATE TRIGGER IF NOT EXISTS trg_predictions_stats_insert
+        AFTER INSERT ON predictions
+        BEGIN
+            INSERT OR IGNORE INTO asset_stats (asset_market) VALUES (NEW.asset_market);
+            UPDATE asset_stats
+               SET total_hit   = total_hit   + COALESCE(NEW.hit, 0),
+                   total_miss  = total_miss  + COALESCE(NEW.miss, 0),
+                   total_count = total_count + 1
+             WHERE asset_market = NEW.asset_market;
+            UPDATE index_totals
+               SET total_hit   = total_hit   + COALESCE(NEW.hit, 0),
+                   total_miss  = total_miss  + COALESCE(NEW.miss, 0),
+                   total_count = total_count + 1
+             WHERE id = 1;
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS trg_predictions_stats_delete
+        AFTER DELETE ON predictions
+        BEGIN
+            UPDATE asset_stats
+               SET total_hit   = total_hit   - COALESCE(OLD.hit, 0),
+                   total_miss  = total_miss  - COALESCE(OLD.miss, 0),
+                   total_count = total_count - 1
+             WHERE asset_market = OLD.asset_market;
+            DELETE FROM asset_stats WHERE asset_market = OLD.asset_market AND total_count <= 0;
+            UPDATE index_totals
+               SET total_hit   = total_hit   - COALESCE(OLD.hit, 0),
+                   total_miss  = total_miss  - COALESCE(OLD.miss, 0),
+                   total_count = total_count - 1
+             WHERE id = 1;
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS trg_predictions_stats_update
+        AFTER UPDATE OF asset_market, hit, miss ON predictions
+        BEGIN
+            UPDATE asset_stats
+               SET total_hit   = total_hit   - COALESCE(OLD.hit, 0),
+                   total_miss  = total_miss  - COALESCE(OLD.miss, 0),
+                   total_count = total_count - 1
+             WHERE asset_market = OLD.asset_market;
+            DELETE FROM asset_stats WHERE asset_market = OLD.asset_market AND total_count <= 0;
+            INSERT OR IGNORE INTO asset_stats (asset_market) VALUES (NEW.asset_market);
+            UPDATE asset_stats
+               SET total_hit   = total_hit   + COALESCE(NEW.hit, 0),
+                   total_miss  = total_miss  + COALESCE(NEW.miss, 0),
+                   total_count = total_count + 1
+             WHERE asset_market = NEW.asset_market;
+            UPDATE index_totals
+               SET total_hit   = total_hit  + COALESCE(NEW.hit, 0)  - COALESCE(OLD.hit, 0),
+                   total_miss  = total_miss + COALESCE(NEW.miss, 0) - COALESCE(OLD.miss, 0)
+             WHERE id = 1;
+        END;
     """)
+    # 자산별 최근 예측 조회(리포트 윈도 함수)용 인덱스
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_predictions_asset_date "
+        "ON predictions (asset_market, mention_date DESC, id DESC)"
+    )
+    # 가격 갱신 사이클의 채점 범위(채점 기간이 남은 예측)용 인덱스
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_predictions_mention_date ON predictions (mention_date)")
+    _create_version_triggers(conn)
     conn.execute("INSERT OR IGNORE INTO settings (key, value) VALUES ('update_interval', '5')")
+    conn.execute("INSERT OR IGNORE INTO settings (key, value) VALUES ('off_session_interval', '60')")
+    conn.execute("INSERT OR IGNORE INTO settings (key, value) VALUES ('eval_horizons', '1d,1w,1m')")
     # 기존 DB 마이그레이션: ticker 컬럼이 없으면 추가
     try:
         conn.execute("ALTER TABLE predictions ADD COLUMN ticker TEXT")
     except Exception:
         pass  # 이미 존재하면 무시
+    # 자동 채점 컬럼: result_locked=1 이면 관리자가 직접 입력한 값 → 자동 채점 제외
+    try:
+        conn.execute("ALTER TABLE predictions ADD COLUMN result_locked INTEGER DEFAULT 0")
+        # 기존에 손으로 입력한 적중/실패 값은 덮어쓰지 않도록 잠금
+        conn.execute("UPDATE predictions SET result_locked=1 WHERE hit>0 OR miss>0")
+    except Exception:
+        pass
+    try:
+        conn.execute("ALTER TABLE predictions ADD COLUMN live_result TEXT")  # 최신가 기준 잠정 결과
+    except Exception:
+        pass
+    try:
+        conn.execute("ALTER TABLE prices ADD COLUMN stale_since TEXT")  # 가격 지연 표시
+    except Exception:
+        pass
+    _rebuild_stats(conn)
     conn.commit()
     conn.close()
 
 
+# data_versions로 변경을 추적하는 테이블 (API 응답이 의존하는 테이블)
+VERSIONED_TABLES = ("predictions", "prices", "daily_index", "settings")
+
+
+def _create_version_triggers(conn):
+    """VERSIONED_TABLES 의 INSERT/UPDATE/DELETE 마다 data_versions 카운터 증가"""
+    for table in VERSIONED_TABLES:
+        conn.execute("INSERT OR IGNORE INTO data_versions (name) VALUES (?)", (table,))
+        for event in ("INSERT", "UPDATE", "DELETE"):
+            conn.execute(
+                f"""CREATE TRIGGER IF NOT EXISTS trg_{table}_version_{event.lower()}
+                    AFTER {event} ON {table}
+                    BEGIN
+                        UPDATE data_versions
+                           SET version = version + 1, updated_at = CURRENT_TIMESTAMP
+                         WHERE name = '{table}';
+                    END"""
+            )
+
+
+def get_meta(conn, key: str, default=None):
+    row = conn.execute("SELECT value FROM app_meta WHERE key=?", (key,)).fetchone()
+    return row["value"] if row else default
+
+
+def set_meta(conn, key: str, value):
+    """app_meta 값 저장 (commit은 호출자 책임)"""
+    conn.execute("INSERT OR REPLACE INTO app_meta (key, value) VALUES (?,?)", (key, value))
+
+
+def acquire_lease(conn, name: str, holder: str, ttl: float, commit: bool = True) -> bool:
+    """
+    임대 획득/갱신 → 성공 여부
+    비어 있거나 만료됐거나 이미 내가 가진 임대만 가져옴 (문장 하나라 원자적)
+    commit=False: 호출자가 연 트랜잭션 안에서 다른 쓰기와 함께 처리
+    """
+    now = time.time()
+    conn.execute(
+        """INSERT INTO leases (name, holder, expires_at) VALUES (?,?,?)
+           ON CONFLICT(name) DO UPDATE
+              SET holder = excluded.holder, expires_at = excluded.expires_at
+            WHERE leases.holder = excluded.holder OR leases.expires_at < ?""",
+        (name, holder, now + ttl, now),
+    )
+    if commit:
+        conn.commit()
+    row = conn.execute("SELECT holder FROM leases WHERE name=?", (name,)).fetchone()
+    return bool(row) and row["holder"] == holder
+
+
+def release_lease(conn, name: str, holder: str, commit: bool = True):
+    conn.execute("DELETE FROM leases WHERE name=? AND holder=?", (name, holder))
+    if commit:
+        conn.commit()
+
+
+def get_data_versions(conn, tables) -> dict:
+    """{테이블명: (version, updated_at)} — updated_at은 UTC 'YYYY-MM-DD HH:MM:SS'"""
+    placeholders = ",".join("?" * len(tables))
+    rows = conn.execute(
+        f"SELECT name, version, updated_at FROM data_versions WHERE name IN ({placeholders})",
+        tuple(tables),
+    ).fetchall()
+    return {r["name"]: (r["version"], r["updated_at"]) for r in rows}
+
+
+def _rebuild_stats(conn):
+    """집계 테이블을 predictions 기준으로 다시 계산 (기동 시 1회 — 트리거 도입 전 데이터·불일치 보정)"""
+    conn.execute("DELETE FROM asset_stats")
+    conn.execute(
+        """INSERT INTO asset_stats (asset_market, total_hit, total_miss, total_count)
+           SELECT asset_market, COALESCE(SUM(hit),0), COALESCE(SUM(miss),0), COUNT(*)
+           FROM predictions
+           GROUP BY asset_market"""
+    )
+    conn.execute(
+        """INSERT OR REPLACE INTO index_totals (id, total_hit, total_miss, total_count)
+           SELECT 1, COALESCE(SUM(hit),0), COALESCE(SUM(miss),0), COUNT(*)
+           FROM predictions"""
+    )
+
+
+def get_index_totals(conn):
+    """전체 적중/실패/예측 수 → {"h", "m", "c"} (index_totals 단일 행 조회)"""
+    row = conn.execute(
+        "SELECT total_hit h, total_miss m, total_count c FROM index_totals WHERE id=1"
+    ).fetchone()
+    return row if row else {"h": 0, "m": 0, "c": 0}
+
+
+def calc_algamja_index(hit: int, miss: int, ndigits: int = 2) -> float:
+    """적중률(%) = 적중 / (적중 + 실패) × 100, 채점된 예측이 없으면 0"""
+    total = hit + miss
+    return round(hit / total * 100, ndigits) if total else 0
+
+
 def _save_daily_index(conn):
     """열린 커넥션을 받아 오늘 날짜 알감자지수를 daily_index 테이블에 저장"""
     try:
-        row = conn.execute(
-            "SELECT COALESCE(SUM(hit),0) h, COALESCE(SUM(miss),0) m FROM predictions"
-        ).fetchone()
-        total = row["h"] + row["m"]
-        if total > 0:
-            idx   = round(row["h"] / total * 100, 2)
+        row = get_index_totals(conn)
+        if row["h"] + row["m"] > 0:
+            idx   = calc_algamja_index(row["h"], row["m"])
             today = date.today().isoformat()
             conn.execute(
                 "INSERT OR REPLACE INTO daily_index (date, algamja_index) VALUES (?,?)",
@@ -0,0 +1,123 @@
+"""
+예측 자동 채점 모듈 - 언급가 대비 최신 가격 / 기간별(1d·1w·1m) 가격으로 적중·실패 계산
+채점은 SQL 한 문장이며 결과가 바뀐 행만 UPDATE 한다. 채점 범위:
+  - 관리자 추가/수정  : 바뀐 예측 한 건 (pid)
+  - 가격 갱신 사이클  : 아직 채점 기간(만기 + 유예)이 끝나지 않은 예측만 (open_only)
+  - 채점 기간 설정 변경: 전체
+
+  hit / miss   : 만기가 지난 기간 중 방향이 맞은 / 틀린 기간 수
+  live_result  : 아직 만기 전 기간이 남은 예측의 최신가 기준 잠정 결과 ('HIT' / 'MISS')
+  result_locked: 관리자가 직접 입력한 예측(1)은 채점 대상에서 제외
+"""
+from datetime import datetime, timedelta
+
+from database import get_db, _save_daily_index
+
+# 채점 기간 라벨 → 일수 (settings.eval_horizons 에서 쉼표로 선택, 빈 값이면 자동 채점 끔)
+HORIZONS = {"1d": 1, "1w": 7, "1m": 30}
+
+# 만기 시점 이후 이 기간 안의 첫 가격만 인정 (시계열 수집 전 예측을 엉뚱한 가격으로 채점하지 않도록)
+MIN_GRACE_DAYS = 3
+
+_DIRECTION_HIT = """(
+    (p.direction = 'UP'   AND {price} > p.mention_price) OR
+    (p.direction = 'DOWN' AND {price} < p.mention_price)
+)"""
+
+_EVALUATE_SQL = """
+WITH horizons(days, grace) AS (VALUES {values}),
+targets AS (
+    SELECT p.id, p.asset_market,
+           strftime('%Y-%m-%dT%H:%M:%S', p.mention_date, '+' || h.days || ' days')             AS target,
+           strftime('%Y-%m-%dT%H:%M:%S', p.mention_date, '+' || (h.days + h.grace) || ' days') AS deadline
+    FROM predictions p CROSS JOIN horizons h
+    WHERE COALESCE(p.result_locked, 0) = 0{where}
+),
+graded AS (
+    SELECT t.id,
+           t.target > :now AS pending,
+           (SELECT ph.price FROM price_history ph
+             WHERE ph.asset_market = t.asset_market
+               AND ph.ts >= t.target AND ph.ts < t.deadline
+             ORDER BY ph.ts LIMIT 1) AS price
+    FROM targets t
+),
+scored AS (
+    SELECT p.id,
+           SUM(g.price IS NOT NULL AND {hit_g})     AS hit,
+           SUM(g.price IS NOT NULL AND NOT {hit_g}) AS miss,
+           CASE WHEN MAX(g.pending) = 1 AND pr.current_price IS NOT NULL
+                THEN CASE WHEN {hit_live} THEN 'HIT' ELSE 'MISS' END
+           END AS live_result
+    FROM predictions p
+    JOIN graded g ON g.id = p.id
+    LEFT JOIN prices pr ON pr.asset_market = p.asset_market
+    GROUP BY p.id
+)
+UPDATE predictions
+SET hit = scored.hit, miss = scored.miss, live_result = scored.live_result
+FROM scored
+WHERE predictions.id = scored.id
+  AND (predictions.hit IS NOT scored.hit
+       OR predictions.miss IS NOT scored.miss
+       OR predictions.live_result IS NOT scored.live_result)
+"""
+
+
+def get_horizons(conn) -> list:
+    """settings.eval_horizons → [일수, ...] (알 수 없는 라벨은 무시)"""
+    row = conn.execute("SELECT value FROM settings WHERE key='eval_horizons'").fetchone()
+    labels = (row["value"] if row else "").split(",")
+    return [HORIZONS[l.strip()] for l in labels if l.strip() in HORIZONS]
+
+
+def _evaluate(conn, pid=None, open_only=False) -> int:
+    """열린 커넥션으로 예측 채점 → 변경된 행 수 (commit은 호출자 책임)"""
+    days = get_horizons(conn)
+    if not days:
+        return 0
+    now    = datetime.now()
+    params = {"now": now.isoformat(timespec="seconds")}
+    where  = ""
+    if pid is not None:
+        where += " AND p.id = :pid"
+        params["pid"] = pid
+    if open_only:
+        # 가장 긴 기간의 유예까지 끝난 예측은 새 가격으로 결과가 바뀌지 않음 (하루 여유를 두고 날짜 문자열 비교)
+        window = max(d + max(d, MIN_GRACE_DAYS) for d in days) + 1
+        where += " AND p.mention_date >= :since"
+        params["since"] = (now - timedelta(days=window)).date().isoformat()
+    sql = _EVALUATE_SQL.format(
+        values=",".join(f"({d},{max(d, MIN_GRACE_DAYS)})" for d in days),
+        where=where,
+        hit_g=_DIRECTION_HIT.format(price="g.price"),
+        hit_live=_DIRECTION_HIT.format(price="pr.current_price"),
+    )
+    conn.execute(sql, params)
+    # WITH … UPDATE 문은 cursor.rowcount가 -1 — total_changes는 트리거(asset_stats 등) 변경까지 세므로 changes() 사용
+    return conn.execute("SELECT changes()").fetchone()[0]
+
+
+def evaluate_predictions(conn=None, pid=None, open_only=False) -> int:
+    """
+    예측 자동 채점 → 변경된 행 수
+      pid       : 해당 예측 한 건만
+      open_only : 채점 기간이 끝나지 않은 예측만 (가격 갱신 사이클)
+    결과가 바뀐 경우에만 commit 후 daily_index 갱신
+    """
+    own = conn is None
+    if own:
+        conn = get_db()
+    try:
+        changed = _evaluate(conn, pid=pid, open_only=open_only)
+        if changed:
+            conn.commit()
+            _save_daily_index(conn)
+            print(f"[evaluate] 채점 결과 변경 {changed}건")
+        return changed
+    except Exception as e:
+        print(f"[evaluate] {e}")
+        return 0
+    finally:
+        if own:
+            conn.close()
@@ -0,0 +1,100 @@
+"""
+실시간 변경 알림 모듈 - Server-Sent Events(SSE) 브로드캐스트
+구독자가 있는 동안 감시 스레드 하나가 data_versions 를 주기적으로 확인하고,
+바뀐 테이블 목록을 모든 SSE 연결에 전달.
+DB를 기준으로 감지하므로 다른 gunicorn 워커나 백그라운드 작업의 쓰기도 전달됨.
+연결 하나가 워커 스레드 하나를 잡으므로 프로세스당 SSE_MAX_STREAMS 개까지만 받음.
+"""
+import json
+import queue
+import threading
+import time
+
+from database import get_db, get_data_versions, VERSIONED_TABLES
+from settings import SSE_MAX_STREAMS
+
+POLL_INTERVAL      = 1.0   # data_versions 확인 주기(초)
+HEARTBEAT_INTERVAL = 15    # 프록시가 유휴 연결을 끊지 않도록 보내는 주석 주기(초)
+STREAM_MAX_SECONDS = 300   # 연결 하나가 워커 스레드를 무한정 잡지 않도록 → 브라우저가 자동 재연결
+RETRY_MS           = 3000  # EventSource 재연결 대기(ms)
+
+_subscribers = set()
+_lock        = threading.Lock()
+_wakeup      = threading.Event()
+_watcher     = None
+
+
+def notify():
+    """같은 프로세스에서 쓰기 직후 호출 → 다음 폴링을 기다리지 않고 바로 확인"""
+    _wakeup.set()
+
+
+def _broadcast(message: dict):
+    with _lock:
+        targets = list(_subscribers)
+    for q in targets:
+        try:
+            q.put_nowait(message)
+        except queue.Full:
+            pass  # 느린 클라이언트는 건너뜀 (다음 이벤트나 재연결 시 다시 불러옴)
+
+
+def _watch():
+    """구독자가 있는 동안 data_versions 변경을 감시 — 구독자가 없으면 종료"""
+    global _watcher
+    conn = get_db()
+    try:
+        last = get_data_versions(conn, VERSIONED_TABLES)
+        while True:
+            _wakeup.wait(POLL_INTERVAL)
+            _wakeup.clear()
+            with _lock:
+                if not _subscribers:
+                    _watcher = None
+                    return
+            current = get_data_versions(conn, VERSIONED_TABLES)
+            changed = [t for t in VERSIONED_TABLES if current.get(t) != last.get(t)]
+            if changed:
+                last = current
+                _broadcast({"tables": changed, "versions": {t: v[0] for t, v in current.items()}})
+    except Exception as e:
+        print(f"[events] 감시 중단: {e}")
+        with _lock:
+            _watcher = None
+    finally:
+        conn.close()
+
+
+def subscribe():
+    """구독 큐 반환 — 이 프로세스의 연결 수가 SSE_MAX_STREAMS 에 도달했으면 None"""
+    global _watcher
+    q = queue.Queue(maxsize=32)
+    with _lock:
+        if len(_subscribers) >= SSE_MAX_STREAMS:
+            return None
+        _subscribers.add(q)
+        if _watcher is None:
+            _watcher = threading.Thread(target=_watch, daemon=True, name="sse-watcher")
+            _watcher.start()
+    return q
+
+
+def unsubscribe(q: queue.Queue):
+    with _lock:
+        _subscribers.discard(q)
+
+
+def stream(q: queue.Queue):
+    """SSE 응답 본문 제너레이터 (subscribe() 큐): change 이벤트 + 하트비트, STREAM_MAX_SECONDS 후 종료"""
+    deadline = time.monotonic() + STREAM_MAX_SECONDS
+    try:
+        yield f"retry: {RETRY_MS}\n\n"
+        while time.monotonic() < deadline:
+            try:
+                message = q.get(timeout=HEARTBEAT_INTERVAL)
+            except queue.Empty:
+                yield ": ping\n\n"
+                continue
+            yield f"event: change\ndata: {json.dumps(message)}\n\n"
+    finally:
+        unsubscribe(q)
@@ -5,7 +5,11 @@ PORT 환경변수를 Python에서 직접 읽어 안정적으로 바인딩
 import os
 
 bind    = f"0.0.0.0:{os.environ.get('PORT', '8000')}"
-workers = 1
+# 웹 워커는 상태가 없으므로 여러 개 가능 — 스케줄러·봇은 worker.py 임대로 한 프로세스만 실행
+workers = int(os.environ.get("WEB_CONCURRENCY", "2"))
+# SSE(/api/events)는 연결 하나가 스레드 하나를 점유 → 스레드 워커 사용
+worker_class = "gthread"
+threads = int(os.environ.get("GUNICORN_THREADS", "32"))
 timeout = 120
 accesslog = "-"   # stdout으로 액세스 로그 출력
 errorlog  = "-"   # stdout으로 에러 로그 출력
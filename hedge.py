@@ -0,0 +1,110 @@
+"""
+헤지 조회 모듈 - 같은 값을 주는 여러 공급자를 순서대로 시도하되, 앞 공급자가
+PRICE_HEDGE_DELAY 안에 답하지 않으면 다음 공급자에도 동시에 요청 (먼저 온 유효한 답 채택)
+공급자별 지연 시간(EWMA)·성공률·채택률을 모아 다음 조회의 1순위를 자동으로 다시 고름
+
+  sources: [(이름, fn)] — fn()은 값 또는 None, 예외는 실패로 집계
+"""
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+from settings import PRICE_HEDGE_DELAY, PRICE_REQUEST_TIMEOUT
+
+EWMA_ALPHA   = 0.3   # 지연 시간 이동평균 가중치
+MIN_SAMPLES  = 3     # 이보다 적게 호출된 공급자는 기본 순서 유지 (통계 부족)
+
+_pool  = ThreadPoolExecutor(max_workers=8, thread_name_prefix="hedge")
+_lock  = threading.Lock()
+_stats = {}  # (체인, 공급자) → {"calls", "ok", "wins", "latency"}
+
+
+def _stat(chain: str, source: str) -> dict:
+    return _stats.setdefault((chain, source), {"calls": 0, "ok": 0, "wins": 0, "latency": None})
+
+
+def _record(chain: str, source: str, elapsed: float, ok: bool):
+    with _lock:
+        s = _stat(chain, source)
+        s["calls"] += 1
+        if ok:
+            s["ok"] += 1
+            s["latency"] = elapsed if s["latency"] is None else (
+                EWMA_ALPHA * elapsed + (1 - EWMA_ALPHA) * s["latency"]
+            )
+
+
+def _score(chain: str, source: str):
+    """작을수록 1순위 — 기대 지연 / 성공률 (통계가 부족하면 None)"""
+    s = _stat(chain, source)
+    if s["calls"] < MIN_SAMPLES or not s["ok"]:
+        return None if s["calls"] < MIN_SAMPLES else float("inf")
+    return s["latency"] / (s["ok"] / s["calls"])
+
+
+def ranked(chain: str, sources: list) -> list:
+    """
+    통계 기반 시도 순서 — 통계가 충분한 공급자끼리 그 자리들 안에서 점수순으로 재배치하고,
+    통계가 부족한 공급자(헤지로만 가끔 불리는 3순위 등)는 기본 순서 자리에 그대로 둠
+    """
+    with _lock:
+        scores = [_score(chain, name) for name, _ in sources]
+    slots    = [i for i, score in enumerate(scores) if score is not None]
+    by_score = sorted(slots, key=lambda i: scores[i])
+    order    = list(sources)
+    for slot, i in zip(slots, by_score):
+        order[slot] = sources[i]
+    return order
+
+
+def _call(chain: str, source: str, fn):
+    started = time.perf_counter()
+    try:
+        value = fn()
+    except Exception as e:
+        print(f"[hedge] {chain}/{source}: {e}")
+        value = None
+    _record(chain, source, time.perf_counter() - started, value is not None)
+    return source, value
+
+
+def fetch(chain: str, sources: list, deadline: float = None):
+    """
+    헤지 조회 → (값, 채택된 공급자) / 모두 실패하면 (None, None)
+    1순위 요청 후 PRICE_HEDGE_DELAY 마다(또는 앞 요청이 실패하면 즉시) 다음 공급자 추가
+    """
+    deadline = time.monotonic() + (deadline or PRICE_REQUEST_TIMEOUT * 2)
+    queue    = ranked(chain, sources)
+    pending  = set()
+
+    while queue or pending:
+        if queue and (not pending or time.monotonic() >= next_hedge_at):
+            name, fn = queue.pop(0)
+            pending.add(_pool.submit(_call, chain, name, fn))
+            next_hedge_at = time.monotonic() + PRICE_HEDGE_DELAY
+        wait_for = (next_hedge_at if queue else deadline) - time.monotonic()
+        done, pending = wait(pending, timeout=max(0, wait_for), return_when=FIRST_COMPLETED)
+        for fut in done:
+            source, value = fut.result()
+            if value is not None:
+                with _lock:
+                    _stat(chain, source)["wins"] += 1
+                return value, source
+            next_hedge_at = time.monotonic()  # 실패 → 다음 공급자 바로 투입
+        if time.monotonic() >= deadline:
+            break
+    return None, None
+
+
+def stats() -> dict:
+    """{체인: {공급자: {calls, success_rate, win_rate, latency_ms}}}"""
+    with _lock:
+        out = {}
+        for (chain, source), s in _stats.items():
+            out.setdefault(chain, {})[source] = {
+                "calls":        s["calls"],
+                "success_rate": round(s["ok"] / s["calls"], 3) if s["calls"] else None,
+                "win_rate":     round(s["wins"] / s["calls"], 3) if s["calls"] else None,
+                "latency_ms":   round(s["latency"] * 1000) if s["latency"] is not None else None,
+            }
+        return out
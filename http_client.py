@@ -0,0 +1,76 @@
+"""
+외부 HTTP 호출 모듈 - 호스트별 keep-alive 세션, 재시도(지수 백오프 + 지터), 기본 타임아웃
+CoinGecko / Yahoo 검색 / 텔레그램 호출이 모두 이 모듈을 거쳐 TCP·TLS 연결을 재사용
+(yfinance 시세 조회는 라이브러리가 자체 curl_cffi 세션을 쓰므로 대상 아님)
+"""
+import threading
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+DEFAULT_TIMEOUT = (3.05, 10)   # (연결, 읽기) 초 — 호출부에서 timeout을 주면 그 값 사용
+POOL_MAXSIZE    = 10           # 호스트당 유지할 최대 연결 수 (가격 조회 스레드 수 이상)
+RETRY_TOTAL     = 3
+BACKOFF_FACTOR  = 0.5          # 0.5s, 1s, 2s ...
+BACKOFF_JITTER  = 0.3          # 동시에 실패한 요청들이 같은 순간 재시도하지 않도록
+MAX_RETRY_AFTER = 10           # 서버가 Retry-After로 더 길게 요구해도 이 이상은 기다리지 않음
+RETRY_STATUSES  = (429, 500, 502, 503, 504)
+
+
+class _Retry(Retry):
+    """Retry-After 대기 시간 상한 적용"""
+
+    def get_retry_after(self, response):
+        seconds = super().get_retry_after(response)
+        return min(seconds, MAX_RETRY_AFTER) if seconds is not None else None
+
+
+class _Session(requests.Session):
+    """timeout 미지정 요청에 DEFAULT_TIMEOUT 적용"""
+
+    def request(self, method, url, **kwargs):
+        kwargs.setdefault("timeout", DEFAULT_TIMEOUT)
+        return super().request(method, url, **kwargs)
+
+
+def _make_retry(idempotent: bool) -> Retry:
+    if idempotent:
+        options = dict(total=RETRY_TOTAL, status_forcelist=RETRY_STATUSES)
+    else:
+        # POST(텔레그램 전송 등)는 중복 전송을 피하려고 연결 실패·429만 재시도
+        options = dict(total=RETRY_TOTAL, read=0, status_forcelist=(429,), allowed_methods=None)
+    options.update(backoff_factor=BACKOFF_FACTOR, raise_on_status=False)
+    try:
+        return _Retry(backoff_jitter=BACKOFF_JITTER, **options)
+    except TypeError:  # urllib3 1.x에는 backoff_jitter 없음
+        return _Retry(**options)
+
+
+_sessions = {}
+_lock     = threading.Lock()
+
+
+def session_for(url: str, idempotent: bool = True) -> requests.Session:
+    """URL 호스트별 공유 세션 (재시도 정책이 달라 GET/POST 세션은 분리)"""
+    parts = urlsplit(url)
+    key   = (parts.scheme, parts.netloc, idempotent)
+    with _lock:
+        session = _sessions.get(key)
+        if session is None:
+            session = _Session()
+            adapter = HTTPAdapter(
+                pool_connections=1, pool_maxsize=POOL_MAXSIZE, max_retries=_make_retry(idempotent),
+            )
+            session.mount(f"{parts.scheme}://", adapter)
+            _sessions[key] = session
+    return session
+
+
+def get(url: str, **kwargs) -> requests.Response:
+    return session_for(url).get(url, **kwargs)
+
+
+def post(url: str, **kwargs) -> requests.Response:
+    return session_for(url, idempotent=False).post(url, **kwargs)
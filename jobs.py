@@ -0,0 +1,347 @@
+"""
+작업 관리 모듈 - 가격 갱신 / 텔레그램 리포트의 단일 실행(single-flight) 보장
+같은 작업이 이미 돌고 있으면 새 스레드를 띄우지 않고:
+  - 진행 중인 실행이 요청 범위를 포함하면 그 실행에 합류 (joined)
+  - 포함하지 않으면 대기열에 올리고, 대기 중인 요청끼리는 범위를 합쳐 1회로 병합 (queued)
+다른 프로세스(gunicorn 워커 / worker.py)에서 실행 중인지는 leases 테이블의 job:<이름> 임대로 판단
+  - 실행 중인 범위(app_meta job:<이름>)가 요청을 포함하면 합류
+  - 포함하지 않으면 app_meta job:<이름>:pending 에 범위를 병합해 두고, 임대를 가진 프로세스가
+    실행을 마친 뒤 이어서 실행 (등록과 임대 해제는 각각 한 트랜잭션이라 요청이 사라지지 않음)
+실행 중에는 임대를 주기적으로 갱신하고, 실행 상태·직전 소요 시간은 app_meta 에 남겨
+/api/jobs 가 어느 워커에서든 같은 값을 보여줌
+
+범위(scope): None = 전체 실행, frozenset = 부분 실행 (가격 갱신이면 시장 그룹 목록)
+"""
+import json
+import os
+import socket
+import threading
+import time
+from datetime import datetime
+
+import metrics
+from database import get_db, close_db, get_meta, set_meta, acquire_lease, release_lease
+
+JOB_LEASE_TTL   = 60   # 초 — 실행 중 프로세스가 죽으면 이 시간 뒤엔 다른 프로세스가 실행 가능
+LEASE_RENEW_SEC = 20   # 초 — 실행 중 임대 갱신 주기
+
+HOLDER = f"{socket.gethostname()}:{os.getpid()}"
+
+_lock = threading.Lock()
+_jobs = {}  # 작업명 → {"running", "scope", "pending", "pending_scope", "joined", "coalesced"}
+
+
+def _covers(running, requested) -> bool:
+    """진행 중인 범위가 요청 범위를 포함하는지"""
+    return running is None or (requested is not None and requested <= running)
+
+
+def _merge(a, b):
+    return None if a is None or b is None else a | b
+
+
+def _meta_key(name: str) -> str:
+    return f"job:{name}"
+
+
+def _pending_key(name: str) -> str:
+    return f"job:{name}:pending"
+
+
+def _scope_to_json(scope) -> str:
+    return json.dumps({"scope": sorted(scope) if scope is not None else None})
+
+
+def _scope_from_json(value):
+    scope = json.loads(value)["scope"]
+    return frozenset(scope) if scope is not None else None
+
+
+def _save_state(name: str, **fields):
+    conn = get_db()
+    try:
+        state = json.loads(get_meta(conn, _meta_key(name), "{}"))
+        state.update(fields)
+        set_meta(conn, _meta_key(name), json.dumps(state, ensure_ascii=False))
+        conn.commit()
+    finally:
+        conn.close()
+
+
+# ─────────────────────────────────────────────
+#  프로세스 간 조정 (임대 + 대기 범위)
+# ─────────────────────────────────────────────
+def _holder_covers(conn, name: str, scope) -> bool:
+    """임대를 가진 다른 프로세스가 지금 실행 중인 범위가 요청을 포함하는지"""
+    lease = conn.execute("SELECT holder FROM leases WHERE name=?", (_meta_key(name),)).fetchone()
+    state = json.loads(get_meta(conn, _meta_key(name), "{}"))
+    if not lease or not state.get("running") or state.get("holder") != lease["holder"]:
+        return False  # 임대를 막 얻어 상태를 아직 기록하지 않은 경우 등 → 범위를 알 수 없음
+    running = state.get("scope")
+    return _covers(frozenset(running) if running is not None else None, scope)
+
+
+def _claim(name: str, scope):
+    """
+    임대 획득 시도 → (획득 여부, 실행할 범위)
+    실패하면 같은 트랜잭션에서 요청 범위를 대기 범위에 병합 — 임대를 가진 쪽이 끝난 뒤 이어서 실행
+    획득하면 쌓여 있던 대기 범위를 가져와 함께 실행
+    """
+    conn = get_db()
+    try:
+        if not acquire_lease(conn, _meta_key(name), HOLDER, JOB_LEASE_TTL):
+            if _holder_covers(conn, name, scope):
+                print(f"[jobs] {name}: 다른 프로세스의 실행이 요청 범위를 포함 → 합류")
+                return False, None
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            acquired = acquire_lease(conn, _meta_key(name), HOLDER, JOB_LEASE_TTL, commit=False)
+            pending  = get_meta(conn, _pending_key(name))
+            if acquired:
+                if pending is not None:
+                    scope = _merge(scope, _scope_from_json(pending))
+                    conn.execute("DELETE FROM app_meta WHERE key=?", (_pending_key(name),))
+            else:
+                merged = scope if pending is None else _merge(scope, _scope_from_json(pending))
+                set_meta(conn, _pending_key(name), _scope_to_json(merged))
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        if not acquired:
+            print(f"[jobs] {name}: 다른 프로세스에서 실행 중 → 끝난 뒤 이어서 실행하도록 등록")
+        return acquired, scope
+    finally:
+        conn.close()
+
+
+_NOTHING = object()  # _release: 이어서 실행할 대기 범위 없음 (None 은 "전체 범위")
+
+
+def _release(name: str):
+    """
+    실행 종료 → 다른 프로세스가 등록한 대기 범위가 있으면 (임대를 유지한 채) 그 범위 반환,
+    없으면 임대 해제 후 _NOTHING — 확인과 해제가 한 트랜잭션이라 그 사이 등록이 끼어들지 못함
+    """
+    conn = get_db()
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            pending = get_meta(conn, _pending_key(name))
+            if pending is None:
+                release_lease(conn, _meta_key(name), HOLDER, commit=False)
+            else:
+                conn.execute("DELETE FROM app_meta WHERE key=?", (_pending_key(name),))
+                acquire_lease(conn, _meta_key(name), HOLDER, JOB_LEASE_TTL, commit=False)
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        return _NOTHING if pending is None else _scope_from_json(pending)
+    finally:
+        conn.close()
+
+
+def _renew_lease(name: str, stop: threading.Event):
+    """실행이 JOB_LEASE_TTL 보다 길어져도 다른 프로세스가 임대를 가져가지 않도록 갱신"""
+    while not stop.wait(LEASE_RENEW_SEC):
+        conn = get_db()
+        try:
+            acquire_lease(conn, _meta_key(name), HOLDER, JOB_LEASE_TTL)
+        except Exception as e:
+            print(f"[jobs] {name} 임대 갱신 실패: {e}")
+        finally:
+            conn.close()
+    close_db()  # 스레드 전용 풀 커넥션 정리
+
+
+def _run_once(name: str, fn, scope):
+    """임대를 가진 상태에서 fn(scope) 1회 실행 + 상태 기록 → fn 반환값 (실패하면 None)"""
+    started = time.perf_counter()
+    _save_state(
+        name, running=True, holder=HOLDER,
+        scope=sorted(scope) if scope is not None else None,
+        started_at=datetime.now().isoformat(timespec="seconds"),
+    )
+    stop = threading.Event()
+    threading.Thread(target=_renew_lease, args=(name, stop), daemon=True).start()
+    error = result = None
+    try:
+        result = fn(scope)
+    except Exception as e:
+        error = str(e)
+        print(f"[jobs] {name} 실패: {e}")
+    finally:
+        stop.set()
+        duration = round(time.perf_counter() - started, 3)
+        _save_state(
+            name, running=False,
+            last_finished_at=datetime.now().isoformat(timespec="seconds"),
+            last_duration=duration, last_error=error,
+        )
+        metrics.flush()  # 작업 중 모인 공급자·사이클·텔레그램 메트릭을 공유 테이블에 반영
+    return result
+
+
+def _run_claimed(name: str, fn, scope):
+    """임대를 가진 상태에서 실행 → 다른 프로세스가 등록한 대기 범위가 없을 때까지 이어서 실행 후 임대 해제"""
+    while True:
+        _run_once(name, fn, scope)
+        scope = _release(name)
+        if scope is _NOTHING:
+            return
+        print(f"[jobs] {name}: 다른 프로세스의 대기 요청 이어서 실행 (범위 {sorted(scope) if scope is not None else '전체'})")
+
+
+def _execute(name: str, fn, scope):
+    """
+    임대를 얻으면 실행 — 끝난 뒤 다른 프로세스가 등록한 대기 범위가 있으면 이어서 실행
+    다른 프로세스가 실행 중이면 합류하거나 대기 범위로 넘기고 돌아옴
+    """
+    acquired, scope = _claim(name, scope)
+    if acquired:
+        _run_claimed(name, fn, scope)
+
+
+def _drain_local(name: str, fn):
+    """이 프로세스 대기열에 쌓인 요청을 병합된 범위로 실행 — 비면 실행 중 표시 해제"""
+    while True:
+        with _lock:
+            job = _jobs[name]
+            if not job["pending"]:
+                job["running"] = False
+                return
+            scope = job["pending_scope"]
+            job.update(scope=scope, pending=False, pending_scope=None)
+        _execute(name, fn, scope)
+
+
+def _run_loop(name: str, fn, scope):
+    """실행 → 그 사이 대기열에 쌓인 요청이 있으면 병합된 범위로 한 번 더"""
+    _execute(name, fn, scope)
+    _drain_local(name, fn)
+
+
+def _job(name: str) -> dict:
+    """_lock 을 잡은 상태에서 호출"""
+    return _jobs.setdefault(name, {
+        "running": False, "scope": None, "pending": False, "pending_scope": None,
+        "joined": 0, "coalesced": 0,
+    })
+
+
+def _finish_run_now(name: str, fn):
+    scope = _release(name)
+    if scope is not _NOTHING:
+        _run_claimed(name, fn, scope)
+    _drain_local(name, fn)
+
+
+def run_now(name: str, fn, scope=None):
+    """
+    호출한 스레드에서 바로 1회 실행 → (실행 여부, fn 반환값) — 관리자 프로파일링용
+    같은 작업이 이 프로세스나 다른 프로세스에서 실행 중이면 실행하지 않고 (False, None)
+    실행 중 들어온 요청(대기열·다른 프로세스의 대기 범위)은 끝난 뒤 백그라운드 스레드에서 이어서 실행
+    """
+    with _lock:
+        job = _job(name)
+        if job["running"]:
+            return False, None
+        job.update(running=True, scope=scope)
+    conn = get_db()
+    try:
+        acquired = acquire_lease(conn, _meta_key(name), HOLDER, JOB_LEASE_TTL)
+    finally:
+        conn.close()
+    if not acquired:
+        threading.Thread(target=_drain_local, args=(name, fn), daemon=True).start()
+        return False, None
+    try:
+        result = _run_once(name, fn, scope)
+    finally:
+        threading.Thread(target=_finish_run_now, args=(name, fn), daemon=True).start()
+    return True, result
+
+
+def submit(name: str, fn, scope=None) -> str:
+    """
+    작업 요청 → "started" | "joined" | "queued"
+    fn(scope) 는 백그라운드 스레드에서 실행됨
+    """
+    with _lock:
+        job = _job(name)
+        if job["running"]:
+            if _covers(job["scope"], scope):
+                job["joined"] += 1
+                return "joined"
+            if job["pending"]:
+                job["coalesced"] += 1
+                job["pending_scope"] = _merge(job["pending_scope"], scope)
+            else:
+                job.update(pending=True, pending_scope=scope)
+            return "queued"
+        job.update(running=True, scope=scope)
+    threading.Thread(target=_run_loop, args=(name, fn, scope), daemon=True).start()
+    return "started"
+
+
+# ─────────────────────────────────────────────
+#  앱 작업
+# ─────────────────────────────────────────────
+def _refresh(scope):
+    from prices import update_all_prices
+
+    return update_all_prices(markets=scope)
+
+
+def refresh_prices(markets=None) -> str:
+    """가격 갱신 요청 — markets: 시장 그룹 목록 (None이면 전체)"""
+    scope = frozenset(markets) if markets is not None else None
+    return submit("refresh", _refresh, scope)
+
+
+def refresh_prices_now():
+    """호출한 스레드에서 전체 가격 갱신 1회 (임대 포함) → (실행 여부, 요약) — 이미 실행 중이면 (False, None)"""
+    return run_now("refresh", _refresh)
+
+
+def send_report(force: bool = False) -> str:
+    """
+    텔레그램 리포트 요청
+    강제 전송(범위 None)은 일반 전송(빈 범위)을 포함 → 일반 요청은 강제 전송에 합류하지만 반대는 대기열로
+    """
+    from telegram_bot import send_dashboard_report
+
+    return submit("report", lambda s: send_dashboard_report(force=s is None), None if force else frozenset())
+
+
+def status() -> dict:
+    """/api/jobs 응답 — 작업별 실행 여부, 시작 시각, 직전 소요 시간"""
+    conn = get_db()
+    try:
+        now = time.time()
+        result = {}
+        for name in ("refresh", "report"):
+            state = json.loads(get_meta(conn, _meta_key(name), "{}"))
+            lease = conn.execute(
+                "SELECT holder, expires_at FROM leases WHERE name=?", (_meta_key(name),)
+            ).fetchone()
+            running = bool(lease) and lease["expires_at"] > now
+            waiting = get_meta(conn, _pending_key(name)) is not None  # 다른 프로세스가 등록한 대기 요청
+            with _lock:
+                local = dict(_jobs.get(name, {}))
+            result[name] = {
+                "running":          running,
+                "holder":           lease["holder"] if running else None,
+                "scope":            state.get("scope") if running else None,
+                "started_at":       state.get("started_at"),
+                "last_finished_at": state.get("last_finished_at"),
+                "last_duration":    state.get("last_duration"),
+                "last_error":       state.get("last_error"),
+                "queued":           bool(local.get("pending")) or waiting,
+                "joined":           local.get("joined", 0),
+                "coalesced":        local.get("coalesced", 0),
+            }
+        return result
+    finally:
+        conn.close()
@@ -1,11 +1,27 @@
 # -*- coding: utf-8 -*-
 """
-주요 한국 주식 종목명 → 티커 매핑 테이블
-(KOSPI: .KS, KOSDAQ: .KQ)
-종목명 검색 기능에 사용 — Yahoo Finance는 한글 검색 미지원이라 로컬 목록 사용
+한국 주식 종목명 → 티커 검색 (KOSPI: .KS, KOSDAQ: .KQ)
+Yahoo Finance는 한글 검색 미지원이라 로컬 목록 사용
+
+  - 전체 상장 종목: KRX 종목 마스터 CSV(data/*.csv 또는 KRX_DATA_DIR)를
+    SQLite FTS5 테이블 krx_stocks 로 가져와 조회 (파일이 바뀌었을 때만 다시 가져옴)
+  - 아래 KOSPI_STOCKS / KOSDAQ_STOCKS: 통칭·옛 이름 등 별칭 보강용
 """
+import bisect
+import csv
+import glob
+import os
+import sys
+
+# 종목 마스터 CSV 위치 — KRX 정보데이터시스템 "전종목 기본정보" 다운로드 파일을 그대로 넣어도 됨
+KRX_DATA_DIR = os.environ.get(
+    "KRX_DATA_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+)
 
-# {한글명: (티커, 거래소명)}
+# 시장구분 → Yahoo Finance 티커 접미사 (KONEX 등은 Yahoo 시세가 없어 제외)
+MARKET_SUFFIX = {"KOSPI": ".KS", "KOSDAQ": ".KQ"}
+
+# {한글명: (티커, 거래소명)} — 별칭
 KOSPI_STOCKS = {
     "삼성전자":          ("005930.KS", "KOSPI"),
     "SK하이닉스":        ("000660.KS", "KOSPI"),
@@ -96,7 +112,6 @@ KOSPI_STOCKS = {
     "이노션":            ("214320.KS", "KOSPI"),
     "제일기획":          ("030000.KS", "KOSPI"),
     "삼성엔지니어링":    ("028050.KS", "KOSPI"),
-    "SK에코플랜트":      ("SK에코플랜트", "KOSPI"),
     "영풍":              ("000670.KS", "KOSPI"),
     "CJ":                ("001040.KS", "KOSPI"),
     "LS ELECTRIC":       ("010120.KS", "KOSPI"),
@@ -172,27 +187,295 @@ KOSDAQ_STOCKS = {
 ALL_STOCKS = {**KOSPI_STOCKS, **KOSDAQ_STOCKS}
 
 
+# ─────────────────────────────────────────────
+#  검색 인덱스 (import 시 1회 생성)
+#  - 정규화 키(소문자·공백 제거)의 정렬 목록 → 이분 탐색으로 접두어 검색
+#  - 초성 키 정렬 목록 → "ㅅㅅㅈㅈ" 같은 초성 검색
+#  - 1·2-gram 역색인 → 부분 일치 후보 + 오타 허용(fuzzy) 순위
+# ─────────────────────────────────────────────
+_CHOSUNG = "ㄱㄲㄴㄷㄸㄹㅁㅂㅃㅅㅆㅇㅈㅉㅊㅋㅌㅍㅎ"
+_JAMO    = set("ㄱㄲㄳㄴㄵㄶㄷㄸㄹㄺㄻㄼㄽㄾㄿㅀㅁㅂㅃㅄㅅㅆㅇㅈㅉㅊㅋㅌㅍㅎ")
+
+FUZZY_MIN_SCORE = 0.4   # 2-gram Dice 유사도 하한
+MAX_RESULTS     = 10
+
+_entries      = []   # [(name, ticker, exchange, key, chosung)]
+_exact        = {}   # key → [entry idx]
+_prefix_keys  = []   # 정렬된 (key, idx)
+_chosung_keys = []   # 정렬된 (chosung, idx)
+_gram_index   = {}   # n-gram → {entry idx}
+_ticker_idx   = {}   # 티커 → entry idx (코드 조회·FTS 결과를 같은 순위 체계로 합치기 위함)
+
+
+def _normalize(text: str) -> str:
+    return "".join(text.lower().split())
+
+
+def _to_chosung(text: str) -> str:
+    """한글 음절을 초성으로 변환 (그 외 문자는 그대로)"""
+    out = []
+    for ch in text:
+        code = ord(ch) - 0xAC00
+        out.append(_CHOSUNG[code // 588] if 0 <= code < 11172 else ch)
+    return "".join(out)
+
+
+def _grams(key: str) -> set:
+    """검색용 n-gram: 1글자 키는 그 글자, 그 외에는 2-gram"""
+    if len(key) < 2:
+        return {key} if key else set()
+    return {key[i:i + 2] for i in range(len(key) - 1)}
+
+
+def build_search_index(stocks: dict):
+    """{종목명: (티커, 거래소)} → 검색 인덱스 재구성"""
+    global _entries, _exact, _prefix_keys, _chosung_keys, _gram_index, _ticker_idx
+    entries, exact, gram_index, ticker_idx = [], {}, {}, {}
+    for name, (ticker, exchange) in stocks.items():
+        key = _normalize(name)
+        if not key:
+            continue
+        idx = len(entries)
+        entries.append((name, ticker, exchange, key, _to_chosung(key)))
+        exact.setdefault(key, []).append(idx)
+        ticker_idx.setdefault(ticker, idx)
+        for g in _grams(key) | set(key):   # 1글자 검색어용으로 낱글자도 색인
+            gram_index.setdefault(g, set()).add(idx)
+    _entries      = entries
+    _exact        = exact
+    _prefix_keys  = sorted((e[3], i) for i, e in enumerate(entries))
+    _chosung_keys = sorted((e[4], i) for i, e in enumerate(entries))
+    _gram_index   = gram_index
+    _ticker_idx   = ticker_idx
+
+
+def _prefix_matches(sorted_keys: list, prefix: str):
+    """정렬된 (key, idx) 목록에서 prefix로 시작하는 idx들"""
+    pos = bisect.bisect_left(sorted_keys, (prefix,))
+    while pos < len(sorted_keys) and sorted_keys[pos][0].startswith(prefix):
+        yield sorted_keys[pos][1]
+        pos += 1
+
+
 def search_korean_stock(query: str, suffix: str = '') -> list:
     """
-    한글 종목명으로 검색 (부분 일치)
+    한글 종목명으로 검색 (정확 → 접두어 → 초성 → 부분 일치 → 오타 허용 순)
     suffix: '.KS' = KOSPI만, '.KQ' = KOSDAQ만, '' = 전체
     반환: [{"ticker": str, "name": str, "exchange": str}, ...]
     """
-    query = query.strip()
-    if not query:
+    key = _normalize(query)
+    if not key:
         return []
 
-    results = []
-    seen = set()
+    ranked = {}  # idx → (등급, -유사도)
+
+    def add(idx, rank, similarity=1.0):
+        score = (rank, -similarity)
+        if idx not in ranked or score < ranked[idx]:
+            ranked[idx] = score
 
-    for name, (ticker, exchange) in ALL_STOCKS.items():
+    for idx in _exact.get(key, ()):
+        add(idx, 0)
+    for idx in _prefix_matches(_prefix_keys, key):
+        add(idx, 1)
+    if any(ch in _JAMO for ch in key):
+        for idx in _prefix_matches(_chosung_keys, _to_chosung(key)):
+            add(idx, 2)
+
+    # 전체 상장 종목 FTS5: 한글명·영문명·종목코드 접두어 일치는 접두어 등급으로 합침
+    for ticker in _fts_matches(query):
+        if ticker in _ticker_idx:
+            add(_ticker_idx[ticker], 1)
+
+    query_grams = _grams(key)
+    candidates  = {}
+    for g in query_grams:
+        for idx in _gram_index.get(g, ()):
+            candidates[idx] = candidates.get(idx, 0) + 1
+    for idx, shared in candidates.items():
+        entry_key = _entries[idx][3]
+        if key in entry_key:
+            add(idx, 3)
+        else:
+            similarity = 2 * shared / (len(query_grams) + len(_grams(entry_key)))
+            if similarity >= FUZZY_MIN_SCORE:
+                add(idx, 4, similarity)
+
+    results, seen = [], set()
+    for idx in sorted(ranked, key=lambda i: (ranked[i], len(_entries[i][0]), _entries[i][0])):
+        name, ticker, exchange = _entries[idx][:3]
         if suffix and not ticker.endswith(suffix):
             continue
-        if query.lower() in name.lower():
-            if ticker not in seen:
-                results.append({"ticker": ticker, "name": name, "exchange": exchange})
-                seen.add(ticker)
-
-    # 정확 일치를 먼저
-    results.sort(key=lambda x: (0 if x["name"] == query else 1, x["name"]))
-    return results[:10]
+        if ticker in seen:
+            continue
+        seen.add(ticker)
+        results.append({"ticker": ticker, "name": name, "exchange": exchange})
+        if len(results) >= MAX_RESULTS:
+            break
+    return results
+
+
+def resolve_korean_stock(text: str):
+    """
+    종목명(정확 일치) 또는 6자리 종목코드 → Yahoo 티커 (예: '네이버' / '035420' → '035420.KS')
+    못 찾으면 None
+    """
+    key = _normalize(text or "")
+    if key.isdigit() and len(key) == 6:
+        for suffix in MARKET_SUFFIX.values():
+            if key + suffix in _ticker_idx:
+                return key + suffix
+        return None
+    for idx in _exact.get(key, ()):
+        return _entries[idx][1]
+    return None
+
+
+build_search_index(ALL_STOCKS)
+
+
+# ─────────────────────────────────────────────
+#  KRX 종목 마스터 → FTS5 테이블
+# ─────────────────────────────────────────────
+# CSV 헤더 → 필드 (이 프로젝트 형식 / KRX "전종목 기본정보" 형식 모두 지원)
+_CSV_COLUMNS = {
+    "code":    ("code", "단축코드", "종목코드"),
+    "name":    ("name", "한글 종목약명", "한글종목약명", "종목명", "한글 종목명", "회사명"),
+    "name_en": ("name_en", "영문 종목명", "영문종목명"),
+    "market":  ("market", "시장구분"),
+}
+
+_fts_ready  = False   # krx_stocks 테이블 사용 가능 여부 (FTS5 미지원 SQLite면 False)
+
+
+def _listing_files() -> list:
+    return sorted(glob.glob(os.path.join(KRX_DATA_DIR, "*.csv")))
+
+
+def _read_listing(path: str) -> list:
+    """CSV 한 개 → [(code, name, name_en, market)] (UTF-8 / CP949 자동 판별)"""
+    for encoding in ("utf-8-sig", "cp949"):
+        try:
+            with open(path, newline="", encoding=encoding) as f:
+                reader = csv.DictReader(f)
+                header = [h.strip() for h in (reader.fieldnames or [])]
+                cols   = {
+                    field: next((h for h in names if h in header), None)
+                    for field, names in _CSV_COLUMNS.items()
+                }
+                if not cols["code"] or not cols["name"]:
+                    print(f"[krx] 알 수 없는 CSV 형식, 건너뜀: {path}")
+                    return []
+                rows = []
+                for raw in reader:
+                    raw    = {(k or "").strip(): (v or "").strip() for k, v in raw.items()}
+                    code   = raw[cols["code"]].zfill(6)
+                    market = raw.get(cols["market"] or "", "").upper() or "KOSPI"
+                    if market.startswith("KOSDAQ"):
+                        market = "KOSDAQ"   # "KOSDAQ GLOBAL" 등
+                    if market not in MARKET_SUFFIX or not raw[cols["name"]]:
+                        continue
+                    rows.append((code, raw[cols["name"]], raw.get(cols["name_en"] or "", ""), market))
+                return rows
+        except UnicodeDecodeError:
+            continue
+    print(f"[krx] 인코딩 판별 실패: {path}")
+    return []
+
+
+def sync_krx_listing(conn, force: bool = False) -> int:
+    """
+    data 디렉토리의 CSV가 바뀌었으면 krx_stocks FTS5 테이블을 다시 채움 → 가져온 행 수
+    (변경 없으면 0, FTS5를 쓸 수 없으면 -1)
+    """
+    from database import get_meta, set_meta
+
+    global _fts_ready
+    try:
+        conn.execute(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS krx_stocks USING fts5("
+            "name, name_en, code, market UNINDEXED, prefix='1 2 3')"
+        )
+    except Exception as e:
+        print(f"[krx] FTS5 사용 불가 → 별칭 목록만 사용: {e}")
+        _fts_ready = False
+        return -1
+    _fts_ready = True
+
+    files     = _listing_files()
+    signature = "|".join(f"{os.path.basename(p)}:{os.path.getsize(p)}:{int(os.path.getmtime(p))}" for p in files)
+    if not force and get_meta(conn, "krx_listing_signature") == signature:
+        return 0
+
+    listing = {}
+    for path in files:  # 같은 코드가 여러 파일에 있으면 나중 파일(정렬 순)이 우선
+        for code, name, name_en, market in _read_listing(path):
+            listing[code] = (name, name_en, market)
+
+    conn.execute("DELETE FROM krx_stocks")
+    conn.executemany(
+        "INSERT INTO krx_stocks (code, name, name_en, market) VALUES (?,?,?,?)",
+        [(code, *values) for code, values in listing.items()],
+    )
+    set_meta(conn, "krx_listing_signature", signature)
+    conn.commit()
+    print(f"[krx] 종목 마스터 {len(listing)}개 가져옴 ({len(files)}개 파일)")
+    return len(listing)
+
+
+def load_listing():
+    """기동 시 호출: CSV → krx_stocks 동기화 후 전체 종목 + 별칭으로 검색 인덱스 재구성"""
+    from database import get_db
+
+    conn = get_db()
+    try:
+        sync_krx_listing(conn)
+        stocks = {}
+        if _fts_ready:
+            for r in conn.execute("SELECT code, name, market FROM krx_stocks"):
+                stocks[r["name"]] = (r["code"] + MARKET_SUFFIX[r["market"]], r["market"])
+        stocks.update(ALL_STOCKS)  # 별칭 보강
+        build_search_index(stocks)
+    except Exception as e:
+        print(f"[krx] 종목 목록 로드 실패: {e}")
+    finally:
+        conn.close()
+
+
+def _fts_query(query: str) -> str:
+    """검색어 → FTS5 접두어 질의 (토큰마다 "토큰"* AND)"""
+    tokens = [t.replace('"', '""') for t in query.split()]
+    return " ".join(f'"{t}"*' for t in tokens if t)
+
+
+def _fts_matches(query: str, limit: int = 50) -> list:
+    """krx_stocks에서 한글명·영문명·종목코드 접두어 일치 → [티커]"""
+    if not _fts_ready or not query.strip():
+        return []
+    from database import get_db
+
+    conn = get_db()
+    try:
+        rows = conn.execute(
+            "SELECT code, market FROM krx_stocks WHERE krx_stocks MATCH ? ORDER BY rank LIMIT ?",
+            (_fts_query(query), limit),
+        ).fetchall()
+        return [r["code"] + MARKET_SUFFIX[r["market"]] for r in rows]
+    except Exception as e:
+        print(f"[krx] 검색 오류: {e}")
+        return []
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    # 수동 가져오기: python korean_stocks.py  (KRX_DATA_DIR 의 CSV를 강제로 다시 적재)
+    from database import init_db, get_db
+
+    init_db()
+    _conn = get_db()
+    try:
+        count = sync_krx_listing(_conn, force=True)
+    finally:
+        _conn.close()
+    sys.exit(0 if count >= 0 else 1)
@@ -0,0 +1,59 @@
+"""
+시장 운영시간 모듈 - 자산을 시장 그룹으로 나누고 그룹별 장중 여부 판단
+scheduler.py가 그룹마다 별도 갱신 작업을 두고, 장중에는 update_interval,
+장외에는 off_session_interval 주기로만 가격을 조회 (공휴일은 고려하지 않음)
+
+  krx    : KOSPI/KOSDAQ 지수·개별종목 — 평일 09:00~15:30 (서울)
+  nyse   : 미국 지수·개별종목        — 평일 09:30~16:00 (뉴욕)
+  global : 환율·금·은 선물, 기타 해외  — 일 17:00 ~ 금 17:00 (뉴욕), 24시간/주 5일
+  crypto : 비트코인                  — 24시간/주 7일
+"""
+from datetime import datetime, timedelta
+from zoneinfo import ZoneInfo
+
+# 장 마감 후에도 종가 확정분을 받도록 잠시 더 장중으로 취급
+CLOSE_GRACE = timedelta(minutes=20)
+
+MARKETS = {
+    "krx":    {"label": "KRX",         "tz": ZoneInfo("Asia/Seoul"),       "open": (9, 0),  "close": (15, 30)},
+    "nyse":   {"label": "NYSE",        "tz": ZoneInfo("America/New_York"), "open": (9, 30), "close": (16, 0)},
+    "global": {"label": "FX·원자재",   "tz": ZoneInfo("America/New_York")},
+    "crypto": {"label": "크립토",      "tz": None},
+}
+
+
+def market_of(asset_market: str, symbol: str) -> str:
+    """표시명 + 조회 심볼 → 시장 그룹"""
+    symbol = (symbol or asset_market).upper()
+    if asset_market == "비트코인" or symbol.endswith("-USD"):
+        return "crypto"   # 비트코인 / Yahoo 암호화폐 심볼 (ETH-USD ...)
+    if symbol in ("^KS11", "^KQ11") or symbol.endswith((".KS", ".KQ")):
+        return "krx"
+    if symbol.endswith(("=X", "=F")) or "." in symbol:
+        return "global"   # 환율·선물, 그 밖의 해외 거래소 접미사(.T, .HK ...)
+    return "nyse"         # 접미사 없는 미국 종목 / ^GSPC, ^IXIC
+
+
+def is_open(market: str, now: datetime = None) -> bool:
+    """시장 그룹이 지금 (마감 유예 포함) 장중인지"""
+    spec = MARKETS.get(market)
+    if spec is None or spec["tz"] is None:
+        return True   # crypto 및 알 수 없는 그룹은 항상 갱신
+    local = (now or datetime.now(tz=spec["tz"])).astimezone(spec["tz"])
+
+    if market == "global":
+        # 일요일 17:00 ~ 금요일 17:00 (뉴욕)
+        weekday, hour = local.weekday(), local.hour
+        if weekday == 5:
+            return False
+        if weekday == 6:
+            return hour >= 17
+        if weekday == 4:
+            return hour < 17
+        return True
+
+    if local.weekday() >= 5:
+        return False
+    opens  = local.replace(hour=spec["open"][0], minute=spec["open"][1], second=0, microsecond=0)
+    closes = local.replace(hour=spec["close"][0], minute=spec["close"][1], second=0, microsecond=0)
+    return opens <= local <= closes + CLOSE_GRACE
@@ -0,0 +1,231 @@
+"""
+메트릭 모듈 - 카운터 / 게이지 / 히스토그램 레지스트리 + Prometheus 텍스트 형식 출력 (/metrics)
+
+두 종류의 저장 방식:
+  프로세스 메모리  요청 경로처럼 자주 기록되는 값 (라우트 지연, DB 쿼리 시간) — 응답한 gunicorn 워커 기준
+  공유(shared)     백그라운드 작업 값 (가격 조회, 갱신 사이클, 텔레그램, 스케줄러 지연)
+                   — 어느 프로세스에서 실행돼도 메모리에 모았다가 작업이 끝날 때 flush()로
+                     metrics 테이블에 더해 두어, 어느 워커가 /metrics 에 응답해도 같은 값을 보여줌
+"""
+import bisect
+import threading
+import time
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+DB_BUCKETS      = (0.0001, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.5, 1)
+
+_lock     = threading.Lock()
+_registry = {}   # 이름 → 메트릭
+_pending  = {}   # 공유 메트릭의 flush 전 증감: (이름, 라벨 문자열) → (값, set 여부)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _label_str(names: tuple, values: tuple, extra: str = "") -> str:
+    parts = [f'{k}="{_escape(v)}"' for k, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _fmt(value: float) -> str:
+    return "+Inf" if value == float("inf") else repr(float(value)) if value != int(value) else str(int(value))
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help_text: str, labels: tuple = (), shared: bool = False):
+        self.name, self.help, self.labels, self.shared = name, help_text, tuple(labels), shared
+        self._values = {}
+        self._lock   = threading.Lock()
+        with _lock:
+            _registry[name] = self
+
+    def _shared_add(self, series: str, amount: float, replace: bool = False):
+        with _lock:
+            value, _ = _pending.get((self.name, series), (0.0, False))
+            _pending[(self.name, series)] = (amount if replace else value + amount, replace)
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, *label_values, amount: float = 1):
+        if self.shared:
+            self._shared_add(_label_str(self.labels, label_values), amount)
+            return
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def samples(self):
+        with self._lock:
+            return [(self.name, _label_str(self.labels, k), v) for k, v in self._values.items()]
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def set(self, value: float, *label_values):
+        if self.shared:
+            self._shared_add(_label_str(self.labels, label_values), value, replace=True)
+            return
+        with self._lock:
+            self._values[label_values] = value
+
+    def samples(self):
+        with self._lock:
+            return [(self.name, _label_str(self.labels, k), v) for k, v in self._values.items()]
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name, help_text, labels=(), buckets=DEFAULT_BUCKETS, shared=False):
+        super().__init__(name, help_text, labels, shared)
+        self.buckets = tuple(buckets) + (float("inf"),)
+
+    def observe(self, value: float, *label_values):
+        idx = bisect.bisect_left(self.buckets, value)
+        if self.shared:
+            # 누적 버킷 형태로 바로 더해 두면 테이블 값이 그대로 출력 형식이 됨 (0인 버킷도 행을 만들어 둠)
+            for i, le in enumerate(self.buckets):
+                self._shared_add(_label_str(self.labels, label_values, f'le="{_fmt(le)}"'), int(i >= idx))
+            base = _label_str(self.labels, label_values)
+            self._shared_add("_sum" + base, value)
+            self._shared_add("_count" + base, 1)
+            return
+        with self._lock:
+            counts, total = self._values.get(label_values, ([0] * len(self.buckets), 0.0))
+            counts[idx] += 1
+            self._values[label_values] = (counts, total + value)
+
+    def time(self, *label_values):
+        return _Timer(self, label_values)
+
+    def samples(self):
+        out = []
+        with self._lock:
+            items = [(k, list(c), t) for k, (c, t) in self._values.items()]
+        for key, counts, total in items:
+            running = 0
+            for le, n in zip(self.buckets, counts):
+                running += n
+                out.append((self.name + "_bucket", _label_str(self.labels, key, f'le="{_fmt(le)}"'), running))
+            out.append((self.name + "_sum", _label_str(self.labels, key), total))
+            out.append((self.name + "_count", _label_str(self.labels, key), running))
+        return out
+
+
+class _Timer:
+    def __init__(self, hist, label_values):
+        self.hist, self.label_values = hist, label_values
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.hist.observe(time.perf_counter() - self.started, *self.label_values)
+
+
+# ─────────────────────────────────────────────
+#  공유 메트릭 저장 / 출력
+# ─────────────────────────────────────────────
+def flush():
+    """공유 메트릭의 누적분을 metrics 테이블에 반영 (백그라운드 작업이 끝날 때 호출)"""
+    from database import get_db
+
+    with _lock:
+        pending = dict(_pending)
+        _pending.clear()
+    if not pending:
+        return
+    adds = [(name, series, value) for (name, series), (value, replace) in pending.items() if not replace]
+    sets = [(name, series, value) for (name, series), (value, replace) in pending.items() if replace]
+    conn = get_db()
+    try:
+        conn.executemany(
+            """INSERT INTO metrics (name, series, value) VALUES (?,?,?)
+               ON CONFLICT(name, series) DO UPDATE SET value = value + excluded.value""",
+            adds,
+        )
+        conn.executemany("INSERT OR REPLACE INTO metrics (name, series, value) VALUES (?,?,?)", sets)
+        conn.commit()
+    except Exception as e:
+        print(f"[metrics] flush 실패: {e}")
+    finally:
+        conn.close()
+
+
+def _shared_samples(conn, metric) -> list:
+    rows = conn.execute("SELECT series, value FROM metrics WHERE name=? ORDER BY series", (metric.name,)).fetchall()
+    if metric.kind != "histogram":
+        return [(metric.name, r["series"], r["value"]) for r in rows]
+    # 히스토그램 행: 버킷은 le 라벨 포함 series, 합계·개수는 "_sum{...}" / "_count{...}" 로 저장
+    buckets, tails = [], []
+    for r in rows:
+        series = r["series"]
+        for suffix in ("_sum", "_count"):
+            if series.startswith(suffix):
+                tails.append((metric.name + suffix, series[len(suffix):], r["value"]))
+                break
+        else:
+            buckets.append((metric.name + "_bucket", series, r["value"]))
+
+    def bucket_order(sample):
+        series = sample[1]
+        base, _, le = series.rpartition('le="')
+        return base, float(le.split('"')[0].replace("+Inf", "inf"))
+
+    return sorted(buckets, key=bucket_order) + tails
+
+
+def render() -> str:
+    """Prometheus 텍스트 노출 형식"""
+    from database import get_db
+
+    with _lock:
+        metrics = list(_registry.values())
+    lines = []
+    conn = get_db()
+    try:
+        for m in metrics:
+            samples = _shared_samples(conn, m) if m.shared else m.samples()
+            lines.append(f"# HELP {m.name} {m.help}")
+            lines.append(f"# TYPE {m.name} {m.kind}")
+            lines.extend(f"{name}{labels} {_fmt(value)}" for name, labels, value in samples)
+    finally:
+        conn.close()
+    return "\n".join(lines) + "\n"
+
+
+# ─────────────────────────────────────────────
+#  앱 메트릭 정의
+# ─────────────────────────────────────────────
+HTTP_REQUESTS = Counter(
+    "algamja_http_requests_total", "HTTP 요청 수 (라우트·메서드·상태코드별)", ("route", "method", "status"))
+HTTP_LATENCY = Histogram(
+    "algamja_http_request_duration_seconds", "HTTP 요청 처리 시간", ("route", "method"))
+DB_QUERY = Histogram(
+    "algamja_db_query_duration_seconds", "SQLite execute 호출 시간 (문장 종류별)", ("op",), buckets=DB_BUCKETS)
+
+PROVIDER_LATENCY = Histogram(
+    "algamja_provider_fetch_duration_seconds", "가격 공급자 호출 시간", ("provider",), shared=True)
+PROVIDER_ERRORS = Counter(
+    "algamja_provider_fetch_errors_total", "가격 공급자 실패 수 (error / timeout / skipped)",
+    ("provider", "kind"), shared=True)
+REFRESH_DURATION = Histogram(
+    "algamja_refresh_cycle_duration_seconds", "update_all_prices 1회 소요 시간", shared=True)
+REFRESH_STALE = Gauge(
+    "algamja_refresh_stale_assets", "직전 갱신에서 가격을 받지 못한 자산 수", shared=True)
+REFRESH_UPDATED = Gauge(
+    "algamja_refresh_updated_assets", "직전 갱신에서 가격을 기록한 자산 수", shared=True)
+TELEGRAM_SENDS = Counter(
+    "algamja_telegram_sends_total", "텔레그램 리포트 결과 (sent / failed / skipped)", ("outcome",), shared=True)
+CIRCUIT_OPEN = Gauge(
+    "algamja_circuit_open", "가격 공급자 서킷 브레이커 차단 여부 (1 = open / half_open)", ("provider",), shared=True)
+SCHEDULER_LAG = Histogram(
+    "algamja_scheduler_lag_seconds", "스케줄 예정 시각 대비 실제 실행 지연", ("job",), shared=True)
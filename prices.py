@@ -1,11 +1,14 @@
 """
-가격 조회 모듈 - yfinance(주식/선물/환율), CoinGecko(비트코인)
+가격 조회 모듈 - yfinance(주식/선물/환율), CoinGecko·Coinbase(비트코인), open.er-api·frankfurter(환율)
 Windows 한글 경로 SSL 인증서 문제도 여기서 처리
 """
 import os
 import sys
+import time
 import shutil
 import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
 from datetime import datetime
 
 
@@ -49,12 +52,40 @@ def _fix_ssl_cert_path():
         print(f"[ssl_fix] 경고: {e}")
 
 
-_fix_ssl_cert_path()  # yfinance import 전에 반드시 실행
+import http_client
+import circuit
+import hedge
+import metrics
 
-import yfinance as yf  # noqa: E402
-import requests        # noqa: E402
+from database import get_db, _save_daily_index
+from evaluation import evaluate_predictions
+from cache import TTLCache, Uncached, cached
+from markets import market_of
+from korean_stocks import resolve_korean_stock
+import events
+from settings import PRICE_FETCH_WORKERS, PRICE_REQUEST_TIMEOUT, PRICE_CYCLE_DEADLINE
 
-from database import get_db, _save_daily_index  # noqa: E402
+
+# ─────────────────────────────────────────────
+#  yfinance 지연 로드
+#  yfinance 는 pandas·curl_cffi 까지 끌고 와 import 에 수백 ms~수 초가 걸리므로
+#  웹 요청 경로(대시보드 조회 등)에서는 불러오지 않고, 첫 조회 때 SSL 경로 수정 후 import
+# ─────────────────────────────────────────────
+_yf_module = None
+_YF_IMPORT_LOCK = threading.Lock()
+
+
+def _yf():
+    global _yf_module
+    if _yf_module is None:
+        with _YF_IMPORT_LOCK:
+            if _yf_module is None:
+                started = time.perf_counter()
+                _fix_ssl_cert_path()  # yfinance import 전에 반드시 실행
+                import yfinance
+                _yf_module = yfinance
+                print(f"[prices] yfinance 로드 {time.perf_counter() - started:.2f}s")
+    return _yf_module
 
 
 ASSET_LIST = ["S&P500", "NASDAQ", "KOSPI", "KOSDAQ", "비트코인", "환율(원/달러)", "금", "은"]
@@ -67,12 +98,30 @@ ASSET_SYMBOLS = {
     "금":           "GC=F",
     "은":           "SI=F",
     "환율(원/달러)": "KRW=X",
+    "비트코인":      "BTC-USD",   # 조회는 CoinGecko — 같은 심볼의 개별 입력과 한 번만 조회하도록 심볼만 공유
 }
 
+# 같은 대상을 가리키는 다른 표기 → 정규 심볼
+SYMBOL_ALIASES = {
+    "BTC":      "BTC-USD",
+    "BTC-KRW":  "BTC-USD",
+    "^KOSPI":   "^KS11",
+    "^KOSDAQ":  "^KQ11",
+    "^SPX":     "^GSPC",
+    "^NDX":     "^IXIC",
+    "USDKRW=X": "KRW=X",
+    "GOLD":     "GC=F",
+    "SILVER":   "SI=F",
+}
+
+
+# yf.download 한 번에 묶어 보낼 최대 심볼 수 (너무 크면 Yahoo가 일부를 누락)
+YF_BATCH_SIZE = 50
+
 
 def _yfinance_price(symbol: str):
     try:
-        hist = yf.Ticker(symbol).history(period="5d")
+        hist = _yf().Ticker(symbol).history(period="5d")
         if not hist.empty:
             return round(float(hist["Close"].dropna().iloc[-1]), 2)
     except Exception as e:
@@ -80,12 +129,51 @@ def _yfinance_price(symbol: str):
     return None
 
 
+def _last_close(df, symbol: str):
+    """yf.download 결과(group_by="ticker")에서 심볼의 마지막 종가 추출"""
+    try:
+        closes = df[symbol]["Close"] if df.columns.nlevels > 1 else df["Close"]
+        closes = closes.dropna()
+        if not closes.empty:
+            return round(float(closes.iloc[-1]), 2)
+    except Exception:
+        pass
+    return None
+
+
+def _yfinance_chunks(symbols) -> list:
+    """심볼 목록을 순서 유지·중복 제거 후 YF_BATCH_SIZE 단위 청크로 분할"""
+    symbols = list(dict.fromkeys(s for s in symbols if s))
+    return [symbols[i:i + YF_BATCH_SIZE] for i in range(0, len(symbols), YF_BATCH_SIZE)]
+
+
+# yf.download는 모듈 전역 상태를 공유하므로 동시에 두 번 호출하면 결과가 섞임
+_YF_DOWNLOAD_LOCK = threading.Lock()
+
+
+def _yfinance_batch(chunk: list) -> dict:
+    """심볼 청크 하나를 일괄 다운로드 → {symbol: price}"""
+    with _YF_DOWNLOAD_LOCK:
+        df = _yf().download(
+            chunk, period="5d", group_by="ticker",
+            progress=False, threads=True, timeout=PRICE_REQUEST_TIMEOUT,
+        )
+    prices = {}
+    if df is None or df.empty:
+        return prices
+    for symbol in chunk:
+        price = _last_close(df, symbol)
+        if price is not None:
+            prices[symbol] = price
+    return prices
+
+
 def _bitcoin_price():
     try:
-        r = requests.get(
+        r = http_client.get(
             "https://api.coingecko.com/api/v3/simple/price",
             params={"ids": "bitcoin", "vs_currencies": "usd"},
-            timeout=10,
+            timeout=PRICE_REQUEST_TIMEOUT,
         )
         if r.ok:
             return round(r.json()["bitcoin"]["usd"], 2)
@@ -94,17 +182,87 @@ def _bitcoin_price():
     return None
 
 
+def _coinbase_price():
+    r = http_client.get("https://api.coinbase.com/v2/prices/BTC-USD/spot", timeout=PRICE_REQUEST_TIMEOUT)
+    return round(float(r.json()["data"]["amount"]), 2) if r.ok else None
+
+
+def _open_er_usdkrw():
+    r = http_client.get("https://open.er-api.com/v6/latest/USD", timeout=PRICE_REQUEST_TIMEOUT)
+    return round(float(r.json()["rates"]["KRW"]), 2) if r.ok else None
+
+
+def _frankfurter_usdkrw():
+    r = http_client.get(
+        "https://api.frankfurter.app/latest", params={"from": "USD", "to": "KRW"},
+        timeout=PRICE_REQUEST_TIMEOUT,
+    )
+    return round(float(r.json()["rates"]["KRW"]), 2) if r.ok else None
+
+
+# ─────────────────────────────────────────────
+#  다중 공급자 헤지 조회 (hedge.py)
+#  심볼 → (체인 이름, [(공급자, fn)]) — 나열 순서가 통계가 쌓이기 전의 기본 우선순위
+#  환율 보조 공급자(open.er-api, frankfurter)는 일 단위 기준환율이라 Yahoo가 기본 1순위
+# ─────────────────────────────────────────────
+HEDGED_SOURCES = {
+    "BTC-USD": ("bitcoin", [
+        ("coingecko", _bitcoin_price),
+        ("yahoo",     lambda: _yfinance_price("BTC-USD")),
+        ("coinbase",  _coinbase_price),
+    ]),
+    "KRW=X": ("usdkrw", [
+        ("yahoo",       lambda: _yfinance_price("KRW=X")),
+        ("open_er_api", _open_er_usdkrw),
+        ("frankfurter", _frankfurter_usdkrw),
+    ]),
+}
+
+
+def _hedged_price(symbol: str):
+    chain, sources = HEDGED_SOURCES[symbol]
+    price, _ = hedge.fetch(chain, sources)
+    return price
+
+
+def resolve_symbol(asset_market: str, ticker: str = None) -> str:
+    """
+    표시명 + 입력 티커 → 정규 심볼
+    고정 자산명, 별칭(^KOSPI → ^KS11), 한국 종목명·6자리 코드('네이버' → 035420.KS)를
+    한 심볼로 모아 같은 대상은 사이클마다 한 번만 조회
+    미국 주식은 표시명 자체가 티커(ticker=NULL)이므로 KRX 조회는 한글 이름·6자리 코드일 때만
+    ('GS', 'KT' 같은 티커가 같은 이름의 한국 종목으로 바뀌지 않도록)
+
+    >>> resolve_symbol("GS", None)
+    'GS'
+    >>> resolve_symbol("네이버", None)
+    '035420.KS'
+    >>> resolve_symbol("^KOSPI")
+    '^KS11'
+    """
+    if not ticker and asset_market in ASSET_SYMBOLS:
+        return ASSET_SYMBOLS[asset_market]
+    raw    = (ticker or asset_market).strip()
+    symbol = SYMBOL_ALIASES.get(raw.upper(), raw.upper())
+    if raw.isascii() and not (raw.isdigit() and len(raw) == 6):
+        return symbol
+    return resolve_korean_stock(raw) or symbol
+
+
 def fetch_price(asset: str):
     """고정 자산 또는 개별종목 티커 모두 처리"""
-    if asset == "비트코인":
-        return _bitcoin_price()
-    symbol = ASSET_SYMBOLS.get(asset)
-    if symbol:
-        return _yfinance_price(symbol)
-    # 고정 자산 목록에 없으면 → 티커로 직접 조회 (개별종목)
-    return _yfinance_price(asset)
+    symbol = resolve_symbol(asset)
+    if symbol in HEDGED_SOURCES:
+        return _hedged_price(symbol)
+    return _yfinance_price(symbol)
+
+
+# 티커 검색 / 검증 결과 캐시 (빈 결과·무효 티커는 negative_ttl 동안만 유지, 조회 오류 결과는 저장하지 않음)
+SEARCH_CACHE   = TTLCache("search_ticker", maxsize=1000, ttl=6 * 3600, negative_ttl=10 * 60)
+VALIDATE_CACHE = TTLCache("validate_ticker", maxsize=500, ttl=10 * 60, negative_ttl=2 * 60)
 
 
+@cached(SEARCH_CACHE, key=lambda query, suffix='': (query.strip().lower(), suffix))
 def search_ticker_by_name(query: str, suffix: str = '') -> list:
     """
     종목명으로 검색 → [{ticker, name, exchange}] 반환
@@ -125,7 +283,7 @@ def search_ticker_by_name(query: str, suffix: str = '') -> list:
         test = validate_ticker(ticker_candidate)
         if test.get("valid"):
             return [{"ticker": ticker_candidate, "name": ticker_candidate, "exchange": suffix.replace(".", "")}]
-        return []
+        return Uncached([]) if test.get("error") else []
 
     # 2) 해외 주식: Yahoo Finance 검색 (영어 쿼리)
     _headers = {
@@ -142,13 +300,14 @@ def search_ticker_by_name(query: str, suffix: str = '') -> list:
         "https://query2.finance.yahoo.com/v1/finance/search",
     ]:
         try:
-            r = requests.get(
+            r = http_client.get(
                 base_url,
                 params={"q": query, "quotesCount": 10, "newsCount": 0, "enableFuzzyQuery": False},
                 headers=_headers,
                 timeout=10,
             )
             if not r.ok:
+                print(f"[search_ticker] {base_url}: HTTP {r.status_code}")
                 continue
             results = []
             for q in r.json().get("quotes", []):
@@ -163,13 +322,14 @@ def search_ticker_by_name(query: str, suffix: str = '') -> list:
             return results
         except Exception as e:
             print(f"[search_ticker] {base_url}: {e}")
-    return []
+    return Uncached([])  # 두 주소 모두 응답 실패 → 결과 없음으로 캐시하지 않음
 
 
+@cached(VALIDATE_CACHE, is_negative=lambda r: not r.get("valid"), key=lambda ticker: ticker.strip().upper())
 def validate_ticker(ticker: str) -> dict:
     """티커 유효성 검사 - 이름과 현재가 반환"""
     try:
-        t = yf.Ticker(ticker)
+        t = _yf().Ticker(ticker)
         info = t.fast_info
         price = getattr(info, "last_price", None)
         if price is None:
@@ -179,50 +339,208 @@ def validate_ticker(ticker: str) -> dict:
         name = getattr(info, "exchange", ticker)
         if price:
             return {"valid": True, "price": round(float(price), 2), "exchange": name}
-    except Exception:
-        pass
+    except Exception as e:
+        print(f"[validate_ticker] {ticker}: {e}")
+        return Uncached({"valid": False, "error": "시세 조회 실패 — 잠시 후 다시 시도하세요"})
     return {"valid": False}
 
 
-def update_all_prices():
-    print(f"[{datetime.now():%H:%M:%S}] 가격 업데이트 시작...")
+# ─────────────────────────────────────────────
+#  동시 조회 엔진
+#  공급자 호출을 제한된 스레드 풀에서 병렬로 실행하고
+#  PRICE_CYCLE_DEADLINE 안에 끝나지 않은 자산은 기존 가격을 유지(stale)
+# ─────────────────────────────────────────────
+def _timed_call(fn):
+    """fn() 실행 → (결과 dict, 소요초, 오류 or None)"""
+    started = time.perf_counter()
+    try:
+        return fn() or {}, time.perf_counter() - started, None
+    except Exception as e:
+        return {}, time.perf_counter() - started, e
+
+
+# 가격을 받은 적이 있는 심볼 — 이런 심볼까지 빈 응답이면 잘못된 티커가 아니라 공급자 장애로 판단
+_known_good = set(ASSET_SYMBOLS.values())
+
+
+def _run_fetch_tasks(tasks: list):
+    """
+    tasks: [(provider, keys, fn)] — fn()은 {key: price} 반환
+    반환: (results, stale_keys, timings)
+      results    : {key: price}
+      stale_keys : 실패·마감 초과로 가격을 얻지 못한 key 목록
+      timings    : {provider: {"calls", "seconds", "errors", "timeouts", "skipped"}}
+    서킷 브레이커(circuit.py)가 열린 공급자의 작업은 호출 없이 바로 stale 처리
+    브레이커에는 공급자별로 사이클당 한 번만 반영:
+      한 작업이라도 가격을 받으면 성공
+      아니면 예외·마감 초과, 또는 정상 조회되던 심볼의 빈 응답이 있을 때만 실패
+      (처음 보는 심볼만 든 작업의 빈 응답은 잘못된 티커일 수 있어 반영하지 않음)
+    """
+    results, stale, timings = {}, [], {}
+    outcomes = {}  # provider → (성공 여부, 실패 사유)
+
+    def fail(provider, reason):
+        if provider not in outcomes:
+            outcomes[provider] = (False, reason)
+
+    def stat_for(provider):
+        return timings.setdefault(
+            provider, {"calls": 0, "seconds": 0.0, "errors": 0, "timeouts": 0, "skipped": 0}
+        )
+
+    allowed = []
+    for provider, keys, fn in tasks:
+        if circuit.allow(provider):
+            allowed.append((provider, keys, fn))
+        else:
+            stat_for(provider)["skipped"] += 1
+            metrics.PROVIDER_ERRORS.inc(provider, "skipped")
+            stale.extend(keys)
+
+    pool    = ThreadPoolExecutor(max_workers=PRICE_FETCH_WORKERS, thread_name_prefix="price-fetch")
+    futures = {pool.submit(_timed_call, fn): (provider, keys) for provider, keys, fn in allowed}
+    try:
+        done, pending = wait(futures, timeout=PRICE_CYCLE_DEADLINE)
+        for fut, (provider, keys) in futures.items():
+            stat = stat_for(provider)
+            stat["calls"] += 1
+            if fut in pending:
+                fut.cancel()
+                stat["seconds"]  += PRICE_CYCLE_DEADLINE
+                stat["timeouts"] += 1
+                metrics.PROVIDER_ERRORS.inc(provider, "timeout")
+                fail(provider, "마감 초과")
+                stale.extend(keys)
+                continue
+            data, elapsed, error = fut.result()
+            stat["seconds"] += elapsed
+            metrics.PROVIDER_LATENCY.observe(elapsed, provider)
+            got = {k: v for k, v in data.items() if v is not None}
+            if error is not None:
+                stat["errors"] += 1
+                print(f"[{provider}] 조회 실패: {error}")
+            if got:
+                outcomes[provider] = (True, None)
+                _known_good.update(got)
+            elif error is not None or _known_good.intersection(keys):
+                fail(provider, error or "빈 응답")
+                metrics.PROVIDER_ERRORS.inc(provider, "error")
+            results.update(got)
+            stale.extend(k for k in keys if results.get(k) is None)
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)  # 멈춘 요청이 갱신 주기를 붙잡지 않도록
+    for provider, _, _ in allowed:
+        if provider not in outcomes:
+            circuit.cancel_probe(provider)
+    for provider, (ok, reason) in outcomes.items():
+        if ok:
+            circuit.record_success(provider)
+        else:
+            circuit.record_failure(provider, reason)
+    return results, stale, timings
+
+
+def update_all_prices(markets=None):
+    """
+    전체 자산 가격 갱신 → 요약 dict 반환
+    {"updated": int, "symbols": int, "stale": [표시명...], "timings": {provider: {...}}}
+    markets: 시장 그룹 목록(markets.py) — 주면 해당 그룹 자산만 갱신
+    """
+    scope = f" ({', '.join(markets)})" if markets is not None else ""
+    print(f"[{datetime.now():%H:%M:%S}] 가격 업데이트 시작{scope}...")
+    cycle_started = time.perf_counter()
+    summary = {"updated": 0, "symbols": 0, "stale": [], "timings": {}}
     conn = get_db()
     try:
-        # 1) 고정 자산 업데이트
-        for asset in ASSET_LIST:
-            price = fetch_price(asset)
-            if price is not None:
-                conn.execute(
-                    "INSERT OR REPLACE INTO prices (asset_market, current_price, updated_at) VALUES (?,?,?)",
-                    (asset, price, datetime.now().isoformat()),
-                )
-                print(f"  {asset}: {price:,.2f}")
-
-        # 2) 예측 테이블에 있는 개별종목 업데이트
-        # ticker 컬럼이 있으면 해당 티커로 가격 조회, 없으면 asset_market을 티커로 사용
+        # 1) 조회 대상 수집: 표시명(asset_market) → 정규 심볼 → 심볼별 표시명 목록
+        # 고정 자산은 ASSET_SYMBOLS, 개별종목은 ticker 컬럼(없으면 asset_market)을 resolve_symbol로 정규화
         # 가격은 항상 asset_market(표시명) 기준으로 저장 → 대시보드 조인에 사용
+        by_name = {asset: ASSET_SYMBOLS[asset] for asset in ASSET_LIST}
+
         placeholders = ",".join("?" * len(ASSET_LIST))
         custom_rows = conn.execute(
             f"SELECT DISTINCT asset_market, ticker FROM predictions "
             f"WHERE asset_market NOT IN ({placeholders})",
             ASSET_LIST,
         ).fetchall()
-
         for row in custom_rows:
-            display_name = row["asset_market"]
-            ticker       = row["ticker"] or display_name  # ticker 없으면 asset_market을 티커로 사용
-            price = _yfinance_price(ticker)
-            if price is not None:
-                conn.execute(
-                    "INSERT OR REPLACE INTO prices (asset_market, current_price, updated_at) VALUES (?,?,?)",
-                    (display_name, price, datetime.now().isoformat()),
-                )
-                label = f"{display_name}({ticker})" if ticker != display_name else display_name
-                print(f"  {label}: {price:,.2f}")
+            by_name[row["asset_market"]] = resolve_symbol(row["asset_market"], row["ticker"])
+        if markets is not None:
+            by_name = {name: sym for name, sym in by_name.items() if market_of(name, sym) in markets}
 
+        targets = {}  # 정규 심볼 → [표시명...]
+        for name, symbol in by_name.items():
+            targets.setdefault(symbol, []).append(name)
+
+        # 2) 공급자별 작업 구성 → 동시 실행 (심볼당 1회, yfinance는 청크 단위 일괄 조회)
+        #    비트코인·환율은 여러 공급자 헤지 조회 (체인 이름을 공급자로 집계)
+        tasks = []
+        for symbol, (chain, _) in HEDGED_SOURCES.items():
+            if symbol in targets:
+                tasks.append((chain, [symbol], lambda symbol=symbol: {symbol: _hedged_price(symbol)}))
+        for chunk in _yfinance_chunks(s for s in targets if s not in HEDGED_SOURCES):
+            tasks.append(("yfinance", chunk, lambda chunk=chunk: _yfinance_batch(chunk)))
+        quotes, stale_symbols, timings = _run_fetch_tasks(tasks)
+
+        # 심볼 가격을 그 심볼을 쓰는 모든 표시명에 배분
+        results = {}
+        for symbol, names in targets.items():
+            price = quotes.get(symbol)
+            if price is None:
+                continue
+            for name in names:
+                results[name] = price
+            print(f"  {', '.join(names)} [{symbol}]: {price:,.2f}")
+
+        # 3) 모든 prices 행 + price_history 추가분을 한 트랜잭션으로 기록
+        #    (stale 자산은 마지막 가격 유지, 시계열에도 추가하지 않음)
+        now  = datetime.now().isoformat(timespec="seconds")
+        rows = [(name, price, now) for name, price in results.items()]
+        conn.executemany(
+            "INSERT OR REPLACE INTO prices (asset_market, current_price, updated_at) VALUES (?,?,?)",
+            rows,
+        )
+        conn.executemany(
+            "INSERT OR IGNORE INTO price_history (asset_market, price, ts) VALUES (?,?,?)",
+            rows,
+        )
+        # 받지 못한 자산은 마지막 가격을 유지한 채 지연 시작 시각만 기록
+        # (이미 지연 중인 행은 건드리지 않아 prices 버전·ETag가 매 사이클 바뀌지 않음)
+        stale_names = [name for symbol in stale_symbols for name in targets.get(symbol, ())]
+        conn.executemany(
+            "UPDATE prices SET stale_since = ? WHERE asset_market = ? AND stale_since IS NULL",
+            [(now, name) for name in stale_names],
+        )
+        circuit.save_snapshot(conn)  # 브레이커 상태 → /api/jobs, /metrics
         conn.commit()
+        evaluate_predictions(conn, open_only=True)  # 새 가격으로 채점 기간이 남은 예측만 자동 채점
         _save_daily_index(conn)
+
+        summary["updated"] = len(results)
+        summary["symbols"] = len(targets)
+        summary["stale"]   = stale_names
+        summary["timings"] = timings
+        summary["hedge"]   = hedge.stats()
     except Exception as e:
         print(f"[update_prices] {e}")
     finally:
         conn.close()
+        events.notify()  # 대시보드 SSE 구독자에게 바로 전파
+
+    metrics.REFRESH_DURATION.observe(time.perf_counter() - cycle_started)
+    metrics.REFRESH_UPDATED.set(summary["updated"])
+    metrics.REFRESH_STALE.set(len(summary["stale"]))
+    if summary["stale"]:
+        print(f"  ⚠️ stale {len(summary['stale'])}개 (마지막 가격 유지): {', '.join(summary['stale'])}")
+    timing_s = ", ".join(
+        f"{p} {t['seconds']:.2f}s/{t['calls']}회"
+        + (f" 실패 {t['errors']}" if t["errors"] else "")
+        + (f" 마감초과 {t['timeouts']}" if t["timeouts"] else "")
+        + (f" 차단 {t['skipped']}" if t["skipped"] else "")
+        for p, t in summary["timings"].items()
+    )
+    print(
+        f"  → 심볼 {summary.get('symbols', 0)}개 조회, {summary['updated']}개 갱신, "
+        f"{time.perf_counter() - cycle_started:.2f}s ({timing_s})"
+    )
+    return summary
@@ -0,0 +1,114 @@
+"""
+프로파일링 모듈 - 관리자용 cProfile 호출 트리 + 느린 요청 로그
+  - 요청마다 SQLite 쿼리별 시간을 스레드 로컬에 모았다가, SLOW_REQUEST_MS 를 넘긴 요청만
+    최근 SLOW_LOG_SIZE 건 보관 (/api/slow-requests)
+  - profile_call(fn): fn 한 번을 cProfile 로 감싸 누적 시간 상위 함수 + 호출 관계(callee) 텍스트 반환
+    (/api/profile — 요청 하나, /api/profile-refresh — update_all_prices 1회)
+"""
+import cProfile
+import io
+import pstats
+import threading
+import time
+from collections import deque
+from datetime import datetime
+
+from settings import SLOW_REQUEST_MS
+
+SLOW_LOG_SIZE   = 100   # 보관할 느린 요청 수
+MAX_QUERIES     = 200   # 요청 하나에서 기록할 최대 쿼리 수
+SQL_PREVIEW     = 200   # 로그에 남길 SQL 앞부분 길이
+PROFILE_TOP     = 40    # 누적 시간 상위 함수 수
+PROFILE_CALLEES = 15    # 호출 관계를 펼쳐 보일 상위 함수 수
+
+_local    = threading.local()
+_slow_log = deque(maxlen=SLOW_LOG_SIZE)
+# cProfile 은 동시에 하나만 켤 수 있음
+_profile_lock = threading.Lock()
+
+
+# ─────────────────────────────────────────────
+#  쿼리 수집 / 느린 요청 로그
+# ─────────────────────────────────────────────
+def begin_capture():
+    """수집 시작 — 중첩 가능 (/api/profile 안에서 실행되는 요청은 바깥 수집에도 함께 기록)"""
+    stack = getattr(_local, "stack", None)
+    if stack is None:
+        stack = _local.stack = []
+    stack.append([])
+
+
+def end_capture() -> list:
+    stack = getattr(_local, "stack", None)
+    return stack.pop() if stack else []
+
+
+def record_query(sql: str, elapsed: float):
+    """database.PooledConnection 에서 호출 — 수집 중인 스레드에서만 기록"""
+    for queries in getattr(_local, "stack", None) or ():
+        if len(queries) < MAX_QUERIES:
+            queries.append((sql, elapsed))
+
+
+def _query_summary(queries: list) -> dict:
+    ranked = sorted(queries, key=lambda q: q[1], reverse=True)
+    return {
+        "query_count": len(queries),
+        "db_ms":       round(sum(q[1] for q in queries) * 1000, 2),
+        "queries":     [
+            {"sql": " ".join(sql.split())[:SQL_PREVIEW], "ms": round(elapsed * 1000, 3)}
+            for sql, elapsed in ranked
+        ],
+    }
+
+
+def finish_request(method: str, path: str, status: int, elapsed: float):
+    queries = end_capture()
+    if elapsed * 1000 < SLOW_REQUEST_MS:
+        return
+    _slow_log.appendleft({
+        "at":     datetime.now().isoformat(timespec="seconds"),
+        "method": method,
+        "path":   path,
+        "status": status,
+        "ms":     round(elapsed * 1000, 2),
+        **_query_summary(queries),
+    })
+
+
+def slow_requests() -> dict:
+    return {"threshold_ms": SLOW_REQUEST_MS, "requests": list(_slow_log)}
+
+
+# ─────────────────────────────────────────────
+#  cProfile
+# ─────────────────────────────────────────────
+def profile_call(fn):
+    """
+    fn() 을 프로파일링 → (반환값, 보고서 텍스트)
+    다른 프로파일링이 진행 중이면 RuntimeError
+    """
+    if not _profile_lock.acquire(blocking=False):
+        raise RuntimeError("다른 프로파일링이 진행 중입니다")
+    try:
+        profiler = cProfile.Profile()
+        begin_capture()
+        started = time.perf_counter()
+        try:
+            result = profiler.runcall(fn)
+        finally:
+            elapsed = time.perf_counter() - started
+            queries = _query_summary(end_capture())
+    finally:
+        _profile_lock.release()
+
+    out = io.StringIO()
+    out.write(f"총 {elapsed * 1000:.1f}ms / SQLite {queries['query_count']}건 {queries['db_ms']}ms\n\n")
+    for q in queries["queries"][:20]:
+        out.write(f"  {q['ms']:>9.3f}ms  {q['sql']}\n")
+    out.write("\n")
+    stats = pstats.Stats(profiler, stream=out)
+    stats.strip_dirs().sort_stats("cumulative")
+    stats.print_stats(PROFILE_TOP)
+    stats.print_callees(PROFILE_CALLEES)
+    return result, out.getvalue()
@@ -2,16 +2,30 @@
 Flask 라우트 모듈 - 모든 API 엔드포인트 + 인증 데코레이터
 Blueprint로 구성하여 app.py에서 등록
 """
-import threading
+import time
+import zlib
+from datetime import datetime, timedelta, timezone
 from functools import wraps
 
-from flask import Blueprint, render_template, request, jsonify, session
+from flask import (
+    Blueprint, Response, render_template, request, jsonify, session, g, current_app,
+    make_response, stream_with_context,
+)
+
+import events
+import metrics
+import profiling
+import jobs
+import circuit
 
 from settings import ADMIN_PASSWORD
-from database import get_db, save_daily_index, _save_daily_index
-from prices import ASSET_LIST, update_all_prices, validate_ticker, search_ticker_by_name
-from telegram_bot import send_dashboard_report
-from scheduler import reset_scheduler
+from database import (
+    get_db, save_daily_index, _save_daily_index,
+    get_index_totals, calc_algamja_index, get_data_versions,
+)
+from evaluation import evaluate_predictions
+from cache import cache_stats
+from prices import ASSET_LIST, validate_ticker, search_ticker_by_name
 
 bp = Blueprint("main", __name__)
 
@@ -26,6 +40,180 @@ def require_admin(f):
     return decorated
 
 
+@bp.before_app_request
+def _start_timer():
+    g.request_started = time.perf_counter()
+    profiling.begin_capture()
+
+
+@bp.after_app_request
+def _record_request(resp):
+    """
+    라우트별 지연·상태코드 메트릭 (라우트는 URL 규칙 기준 — /api/predictions/<int:pid>)
+    + SLOW_REQUEST_MS 를 넘긴 요청은 쿼리별 시간과 함께 느린 요청 로그에 기록
+    """
+    started = g.pop("request_started", None)
+    if started is not None:
+        elapsed = time.perf_counter() - started
+        route   = request.url_rule.rule if request.url_rule else "<unmatched>"
+        metrics.HTTP_LATENCY.observe(elapsed, route, request.method)
+        metrics.HTTP_REQUESTS.inc(route, request.method, str(resp.status_code))
+        profiling.finish_request(request.method, request.full_path.rstrip("?"), resp.status_code, elapsed)
+    return resp
+
+
+@bp.teardown_app_request
+def _drop_capture(exc):
+    """처리 중 예외로 after_request 가 건너뛰어진 요청 — 쿼리 수집만 정리"""
+    if g.pop("request_started", None) is not None:
+        profiling.end_capture()
+
+
+@bp.after_request
+def _notify_writes(resp):
+    """쓰기 요청이 끝나면 SSE 감시 스레드를 깨워 즉시 변경 전파"""
+    if request.method in ("POST", "PUT", "DELETE"):
+        events.notify()
+    return resp
+
+
+def _make_etag(key: str, tables):
+    """(요청 키, 의존 테이블) → (강한 ETag, Last-Modified)"""
+    conn = get_db()
+    try:
+        versions = get_data_versions(conn, tables)
+    finally:
+        conn.close()
+    key_hash = zlib.crc32(f"{key}|{int(bool(session.get('is_admin')))}".encode()) & 0xFFFFFFFF
+    etag     = f"{key_hash:08x}-" + "-".join(str(versions.get(t, (0,))[0]) for t in tables)
+    stamps   = [v[1] for v in versions.values() if v[1]]
+    last_mod = (
+        datetime.strptime(max(stamps), "%Y-%m-%d %H:%M:%S").replace(tzinfo=timezone.utc)
+        if stamps else None
+    )
+    return etag, last_mod
+
+
+def conditional(*tables, window=None):
+    """
+    조건부 GET 데코레이터 — 응답이 의존하는 테이블의 data_versions로 강한 ETag 생성.
+    If-None-Match(또는 If-Modified-Since)가 일치하면 뷰를 실행하지 않고 304 반환.
+    window: 시간에 따라 움직이는 조회 구간의 현재 시작 시각을 돌려주는 함수 (naive 로컬 시각 or None)
+            → ETag 키에 포함하고, 구간이 움직인 시각을 Last-Modified 후보로 사용
+    """
+    def decorator(f):
+        @wraps(f)
+        def decorated(*args, **kwargs):
+            start = window() if window else None
+            key   = request.full_path + (f"|{start.isoformat()}" if start else "")
+            etag, last_mod = _make_etag(key, tables)
+            if start:
+                moved = start.astimezone(timezone.utc)
+                last_mod = max(last_mod, moved) if last_mod else moved
+            if request.if_none_match:
+                not_modified = request.if_none_match.contains(etag)
+            else:
+                ims = request.if_modified_since
+                not_modified = bool(ims and last_mod and last_mod <= ims)
+            if not_modified:
+                resp = make_response("", 304)
+            else:
+                resp = make_response(f(*args, **kwargs))
+                if resp.status_code != 200:
+                    return resp
+            resp.set_etag(etag)
+            resp.last_modified = last_mod
+            resp.cache_control.no_cache = True  # 캐시하되 매번 재검증
+            return resp
+        return decorated
+    return decorator
+
+
+# ─────────────────────────────────────────────
+#  조회 페이로드 (개별 API와 /api/dashboard 공용)
+# ─────────────────────────────────────────────
+DASHBOARD_TABLES = ("predictions", "prices", "daily_index", "settings")
+
+
+def _predictions_payload(conn) -> dict:
+    rows = conn.execute(
+        """SELECT p.id, p.asset_market, p.ticker, p.mention_date, p.mention_price,
+                  p.direction, p.hit, p.miss, p.result_locked, p.live_result, p.created_at,
+                  pr.current_price, pr.updated_at AS price_updated, pr.stale_since AS price_stale_since
+           FROM predictions p
+           LEFT JOIN prices pr ON p.asset_market = pr.asset_market
+           ORDER BY p.mention_date DESC, p.id DESC"""
+    ).fetchall()
+
+    stats   = get_index_totals(conn)
+    algamja = calc_algamja_index(stats["h"], stats["m"])
+
+    # prices 시각은 서버 로컬 시각(오프셋 없음) → 브라우저가 자기 시간대로 읽지 않도록 오프셋을 붙여 보냄
+    # (자산 수만큼만 다르므로 변환 결과를 재사용)
+    aware = {}
+
+    def with_offset(ts):
+        if ts and ts not in aware:
+            aware[ts] = datetime.fromisoformat(ts).astimezone().isoformat(timespec="seconds")
+        return aware.get(ts, ts)
+
+    predictions = []
+    for r in rows:
+        d = dict(r)
+        d["price_updated"]     = with_offset(d["price_updated"])
+        d["price_stale_since"] = with_offset(d["price_stale_since"])
+        predictions.append(d)
+
+    return {
+        "predictions":  predictions,
+        "total_hit":    stats["h"],
+        "total_miss":   stats["m"],
+        "algamja_index": algamja,
+    }
+
+
+def _asset_stats_payload(conn) -> list:
+    """자산별 누적 적중률 요약"""
+    rows = conn.execute(
+        """SELECT asset_market, total_hit, total_miss, total_count
+           FROM asset_stats
+           ORDER BY asset_market"""
+    ).fetchall()
+    return [dict(r) for r in rows]
+
+
+def _daily_index_payload(conn) -> list:
+    rows = conn.execute(
+        "SELECT date, algamja_index FROM daily_index ORDER BY date"
+    ).fetchall()
+    return [dict(r) for r in rows]
+
+
+def _settings_payload(conn) -> dict:
+    rows = conn.execute("SELECT key, value FROM settings").fetchall()
+    return {r["key"]: r["value"] for r in rows}
+
+
+def _dashboard_payload() -> dict:
+    """첫 화면에 필요한 모든 데이터를 하나의 읽기 트랜잭션(WAL 스냅샷)으로 조회"""
+    conn = get_db()
+    began = not conn.in_transaction
+    try:
+        if began:
+            conn.execute("BEGIN")
+        return {
+            "auth":        {"is_admin": bool(session.get("is_admin"))},
+            "predictions": _predictions_payload(conn),
+            "asset_stats": _asset_stats_payload(conn),
+            "daily_index": _daily_index_payload(conn),
+            "settings":    _settings_payload(conn),
+        }
+    finally:
+        if began:
+            conn.rollback()  # 읽기 전용 → 스냅샷만 해제
+        conn.close()
+
+
 # ─────────────────────────────────────────────
 #  페이지
 # ─────────────────────────────────────────────
@@ -34,40 +222,40 @@ def health():
     return "ok", 200
 
 
+@bp.route("/metrics")
+def metrics_endpoint():
+    """Prometheus 텍스트 형식 메트릭 — 요청·DB 값은 응답한 워커 기준, 백그라운드 작업 값은 전체 공유"""
+    return Response(metrics.render(), mimetype="text/plain; version=0.0.4")
+
+
 @bp.route("/")
 def index():
-    return render_template("index.html")
+    """대시보드 데이터를 페이지에 직접 넣어 첫 화면에 추가 API 호출이 없도록 함"""
+    try:
+        etag, _ = _make_etag("/api/dashboard?", DASHBOARD_TABLES)
+        initial = {"etag": f'"{etag}"', "payload": _dashboard_payload()}
+    except Exception as e:
+        print(f"[index] 초기 데이터 생성 실패: {e}")
+        initial = None
+    return render_template("index.html", initial=initial)
+
+
+@bp.route("/api/dashboard")
+@conditional(*DASHBOARD_TABLES)
+def api_dashboard():
+    """auth-status + predictions + asset-stats + daily-index + settings 통합 응답"""
+    return jsonify(_dashboard_payload())
 
 
 # ─────────────────────────────────────────────
 #  예측 API
 # ─────────────────────────────────────────────
 @bp.route("/api/predictions", methods=["GET"])
+@conditional("predictions", "prices")
 def api_get_predictions():
     conn = get_db()
     try:
-        rows = conn.execute(
-            """SELECT p.id, p.asset_market, p.ticker, p.mention_date, p.mention_price,
-                      p.direction, p.hit, p.miss, p.created_at,
-                      pr.current_price, pr.updated_at AS price_updated
-               FROM predictions p
-               LEFT JOIN prices pr ON p.asset_market = pr.asset_market
-               ORDER BY p.mention_date DESC, p.id DESC"""
-        ).fetchall()
-
-        stats = conn.execute(
-            "SELECT COALESCE(SUM(hit),0) h, COALESCE(SUM(miss),0) m FROM predictions"
-        ).fetchone()
-
-        total   = stats["h"] + stats["m"]
-        algamja = round(stats["h"] / total * 100, 2) if total else 0
-
-        return jsonify({
-            "predictions":  [dict(r) for r in rows],
-            "total_hit":    stats["h"],
-            "total_miss":   stats["m"],
-            "algamja_index": algamja,
-        })
+        return jsonify(_predictions_payload(conn))
     finally:
         conn.close()
 
@@ -113,7 +301,9 @@ def api_add_prediction():
             "INSERT INTO predictions (asset_market, ticker, mention_date, mention_price, direction) VALUES (?,?,?,?,?)",
             (d["asset_market"], ticker, d["mention_date"], float(d["mention_price"]), d["direction"]),
         )
+        pid = conn.execute("SELECT last_insert_rowid()").fetchone()[0]
         conn.commit()
+        evaluate_predictions(conn, pid=pid)
         return jsonify({"success": True})
     except Exception as e:
         return jsonify({"error": str(e)}), 500
@@ -141,6 +331,7 @@ def api_update_prediction(pid):
             (d["asset_market"], ticker, d["mention_date"], float(d["mention_price"]), d["direction"], pid),
         )
         conn.commit()
+        evaluate_predictions(conn, pid=pid)
         return jsonify({"success": True})
     except Exception as e:
         return jsonify({"error": str(e)}), 500
@@ -164,16 +355,23 @@ def api_delete_prediction(pid):
 @bp.route("/api/predictions/<int:pid>/result", methods=["POST"])
 @require_admin
 def api_set_result(pid):
-    """적중/실패 숫자 직접 입력"""
+    """
+    적중/실패 숫자 직접 입력 → 해당 예측은 자동 채점에서 제외(result_locked)
+    {"auto": true} 를 보내면 잠금을 풀고 다시 자동 채점
+    """
     d    = request.json or {}
     hit  = d.get("hit")
     miss = d.get("miss")
     conn = get_db()
     try:
+        if d.get("auto"):
+            conn.execute("UPDATE predictions SET result_locked=0 WHERE id=?", (pid,))
+            conn.commit()
+            evaluate_predictions(conn, pid=pid)
         if hit is not None:
-            conn.execute("UPDATE predictions SET hit=?  WHERE id=?", (max(0, int(hit)),  pid))
+            conn.execute("UPDATE predictions SET hit=?,  result_locked=1, live_result=NULL WHERE id=?", (max(0, int(hit)),  pid))
         if miss is not None:
-            conn.execute("UPDATE predictions SET miss=? WHERE id=?", (max(0, int(miss)), pid))
+            conn.execute("UPDATE predictions SET miss=?, result_locked=1, live_result=NULL WHERE id=?", (max(0, int(miss)), pid))
         conn.commit()
         _save_daily_index(conn)
         return jsonify({"success": True})
@@ -187,45 +385,125 @@ def api_set_result(pid):
 #  통계 / 지수 API
 # ─────────────────────────────────────────────
 @bp.route("/api/daily-index")
+@conditional("daily_index")
 def api_daily_index():
     conn = get_db()
     try:
-        rows = conn.execute(
-            "SELECT date, algamja_index FROM daily_index ORDER BY date"
-        ).fetchall()
-        return jsonify([dict(r) for r in rows])
+        return jsonify(_daily_index_payload(conn))
+    finally:
+        conn.close()
+
+
+# range 파라미터 → 조회 기간 (None = 전체)
+HISTORY_RANGES = {
+    "1d":  timedelta(days=1),
+    "1w":  timedelta(weeks=1),
+    "1m":  timedelta(days=30),
+    "3m":  timedelta(days=90),
+    "1y":  timedelta(days=365),
+    "all": None,
+}
+
+# resolution 파라미터 → ISO 시각 문자열에서 버킷 키로 쓸 앞부분 길이 (None = 원본)
+HISTORY_RESOLUTIONS = {
+    "raw": None,
+    "1h":  13,   # YYYY-MM-DDTHH
+    "1d":  10,   # YYYY-MM-DD
+}
+
+
+def _history_window_start():
+    """
+    현재 조회 구간이 움직인 시각 — 구간 시작을 정시 단위로 맞춰 같은 시간대 안에서는 같은 응답(같은 ETag)
+    range=all 이나 잘못된 range 는 None
+    """
+    if not HISTORY_RANGES.get(request.args.get("range", "1w")):
+        return None
+    return datetime.now().replace(minute=0, second=0, microsecond=0)
+
+
+@bp.route("/api/price-history")
+@conditional("prices", window=_history_window_start)
+def api_price_history():
+    """로컬 가격 시계열 조회 — ?asset=KOSPI&range=1w&resolution=1h (구간 시작은 정시 단위)"""
+    asset      = request.args.get("asset", "").strip()
+    rng        = request.args.get("range", "1w")
+    resolution = request.args.get("resolution", "raw")
+    if not asset:
+        return jsonify({"error": "asset 파라미터가 필요합니다"}), 400
+    if rng not in HISTORY_RANGES:
+        return jsonify({"error": f"range는 {', '.join(HISTORY_RANGES)} 중 하나여야 합니다"}), 400
+    if resolution not in HISTORY_RESOLUTIONS:
+        return jsonify({"error": f"resolution은 {', '.join(HISTORY_RESOLUTIONS)} 중 하나여야 합니다"}), 400
+
+    span  = HISTORY_RANGES[rng]
+    since = (_history_window_start() - span).isoformat(timespec="seconds") if span else ""
+    width = HISTORY_RESOLUTIONS[resolution]
+    conn  = get_db()
+    try:
+        if width is None:
+            rows = conn.execute(
+                "SELECT ts, price FROM price_history WHERE asset_market=? AND ts>=? ORDER BY ts",
+                (asset, since),
+            ).fetchall()
+        else:
+            # 버킷별 마지막 값: SQLite는 MAX() 집계 시 같은 행의 다른 컬럼 값을 돌려줌
+            rows = conn.execute(
+                """SELECT MAX(ts) ts, price
+                   FROM price_history
+                   WHERE asset_market=? AND ts>=?
+                   GROUP BY substr(ts, 1, ?)
+                   ORDER BY ts""",
+                (asset, since, width),
+            ).fetchall()
+        return jsonify({
+            "asset":      asset,
+            "range":      rng,
+            "resolution": resolution,
+            "points":     [dict(r) for r in rows],
+        })
     finally:
         conn.close()
 
 
 @bp.route("/api/asset-stats")
+@conditional("predictions")
 def api_asset_stats():
     """자산별 누적 적중률 요약"""
     conn = get_db()
     try:
-        rows = conn.execute(
-            """SELECT asset_market,
-                      COALESCE(SUM(hit),0)   total_hit,
-                      COALESCE(SUM(miss),0)  total_miss,
-                      COUNT(*)               total_count
-               FROM predictions
-               GROUP BY asset_market
-               ORDER BY asset_market"""
-        ).fetchall()
-        return jsonify([dict(r) for r in rows])
+        return jsonify(_asset_stats_payload(conn))
     finally:
         conn.close()
 
 
+@bp.route("/api/events")
+def api_events():
+    """
+    변경 알림 SSE 스트림 — data: {"tables": [...], "versions": {...}}
+    워커의 SSE 연결이 가득 차면 204 (EventSource 는 재연결하지 않고 닫힘 → 화면은 폴링으로 전환)
+    """
+    q = events.subscribe()
+    if q is None:
+        return Response(status=204, headers={"Cache-Control": "no-store"})
+    resp = Response(
+        stream_with_context(events.stream(q)),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+    resp.call_on_close(lambda: events.unsubscribe(q))  # 본문을 보내기 전에 끊겨도 구독 해제
+    return resp
+
+
 # ─────────────────────────────────────────────
 #  설정 API
 # ─────────────────────────────────────────────
 @bp.route("/api/settings", methods=["GET"])
+@conditional("settings")
 def api_get_settings():
     conn = get_db()
     try:
-        rows = conn.execute("SELECT key, value FROM settings").fetchall()
-        return jsonify({r["key"]: r["value"] for r in rows})
+        return jsonify(_settings_payload(conn))
     finally:
         conn.close()
 
@@ -238,8 +516,9 @@ def api_update_settings():
     try:
         for k, v in data.items():
             conn.execute("INSERT OR REPLACE INTO settings (key, value) VALUES (?,?)", (k, str(v)))
-        conn.commit()
-        reset_scheduler()
+        conn.commit()  # 백그라운드 리더가 settings 버전 변경을 감지해 스케줄러 재설정
+        if "eval_horizons" in data:
+            evaluate_predictions(conn)  # 기간이 바뀌면 이미 끝난 예측도 다시 채점
         return jsonify({"success": True})
     finally:
         conn.close()
@@ -248,8 +527,96 @@ def api_update_settings():
 @bp.route("/api/refresh", methods=["POST"])
 @require_admin
 def api_refresh():
-    threading.Thread(target=update_all_prices, daemon=True).start()
-    return jsonify({"success": True, "message": "가격 업데이트를 시작했습니다"})
+    state = jobs.refresh_prices()
+    message = {
+        "started": "가격 업데이트를 시작했습니다",
+        "joined":  "이미 진행 중인 가격 업데이트에 합류했습니다",
+        "queued":  "진행 중인 업데이트가 끝나면 이어서 실행합니다",
+    }[state]
+    return jsonify({"success": True, "state": state, "message": message})
+
+
+@bp.route("/api/jobs")
+@require_admin
+def api_jobs():
+    """
+    가격 갱신 / 리포트 작업 상태 — 실행 여부, 시작 시각, 직전 소요 시간
+    + circuits: 공급자별 서킷 브레이커 (state, failures, retry_in, trips, short_circuited, last_error)
+    """
+    conn = get_db()
+    try:
+        breakers = circuit.load_snapshot(conn)
+    finally:
+        conn.close()
+    return jsonify({**jobs.status(), "circuits": breakers})
+
+
+@bp.route("/api/cache-stats")
+@require_admin
+def api_cache_stats():
+    """티커 검색/검증 캐시 적중 통계"""
+    return jsonify(cache_stats())
+
+
+# ─────────────────────────────────────────────
+#  프로파일링 API (관리자)
+# ─────────────────────────────────────────────
+@bp.route("/api/slow-requests")
+@require_admin
+def api_slow_requests():
+    """SLOW_REQUEST_MS 를 넘긴 최근 요청 — 쿼리별 시간 포함"""
+    return jsonify(profiling.slow_requests())
+
+
+@bp.route("/api/profile", methods=["GET", "POST"])
+@require_admin
+def api_profile():
+    """
+    요청 하나를 cProfile 로 실행해 호출 트리 반환 — ?path=/api/dashboard&method=GET
+    POST 로 보낸 본문은 대상 요청의 본문으로 그대로 전달
+    """
+    path   = request.args.get("path", "/api/dashboard")
+    method = request.args.get("method", "GET").upper()
+    if not path.startswith("/") or path.startswith("/api/profile"):
+        return jsonify({"error": "path는 /로 시작하는 다른 엔드포인트여야 합니다"}), 400
+
+    app = current_app._get_current_object()
+    headers = {k: v for k, v in request.headers if k.lower() in ("cookie", "content-type", "if-none-match")}
+    data    = request.get_data() if request.method == "POST" else None
+
+    def dispatch():
+        # 새 앱 컨텍스트(g)로 감싸 바깥 요청의 메트릭·쿼리 수집과 섞이지 않게 함
+        with app.app_context(), app.test_request_context(path, method=method, headers=headers, data=data):
+            resp = app.full_dispatch_request()
+            if resp.is_streamed:
+                resp.close()
+                raise RuntimeError("스트리밍 응답은 프로파일링할 수 없습니다")
+            resp.get_data()
+            return resp.status_code
+
+    try:
+        status, report = profiling.profile_call(dispatch)
+    except RuntimeError as e:
+        return jsonify({"error": str(e)}), 409
+    return Response(f"{method} {path} → {status}\n{report}", mimetype="text/plain")
+
+
+@bp.route("/api/profile-refresh", methods=["POST"])
+@require_admin
+def api_profile_refresh():
+    """
+    update_all_prices 1회를 이 요청 안에서 cProfile 로 실행해 호출 트리 반환
+    예약·수동 갱신과 같은 job:refresh 임대를 잡고 실행 — 이미 실행 중이면 409
+    """
+    try:
+        (ran, summary), report = profiling.profile_call(jobs.refresh_prices_now)
+    except RuntimeError as e:
+        return jsonify({"error": str(e)}), 409
+    if not ran:
+        return jsonify({"error": "가격 업데이트가 진행 중입니다 — 끝난 뒤 다시 시도하세요"}), 409
+    summary = summary or {"updated": 0, "stale": []}
+    head = f"update_all_prices → 심볼 {summary.get('symbols', 0)}개, 갱신 {summary['updated']}개, stale {len(summary['stale'])}개"
+    return Response(f"{head}\n{report}", mimetype="text/plain")
 
 
 # ─────────────────────────────────────────────
@@ -278,5 +645,4 @@ def api_logout():
 @bp.route("/api/send-report", methods=["POST"])
 @require_admin
 def api_send_report():
-    threading.Thread(target=send_dashboard_report, daemon=True).start()
-    return jsonify({"success": True})
+    return jsonify({"success": True, "state": jobs.send_report(force=True)})
@@ -1,38 +1,91 @@
 """
 스케줄러 모듈 - APScheduler 기반 주기적 가격 업데이트 + 텔레그램 리포트
+시장 그룹(markets.py)마다 별도 작업: 장중에는 update_interval,
+장외에는 off_session_interval 이 지났을 때만 가격 조회
+실행은 jobs.py 를 거쳐 수동 갱신·다른 그룹 작업과 겹치면 합류/병합
 """
+import time
+from datetime import datetime, timezone
+
+from apscheduler.events import EVENT_JOB_EXECUTED, EVENT_JOB_ERROR
 from apscheduler.schedulers.background import BackgroundScheduler
+import jobs
+import metrics
 from database import get_db
+from markets import MARKETS, is_open
 
 scheduler = BackgroundScheduler(daemon=True)
 
 
-def _scheduled_job():
-    """주기적으로 실행되는 작업: 가격 업데이트 → 텔레그램 리포트"""
-    from prices import update_all_prices
-    from telegram_bot import send_dashboard_report
-    update_all_prices()
-    send_dashboard_report()
+def _record_lag(event):
+    """예정 시각 대비 실제 실행 시각 지연 → 메트릭 (작업 id별: prices:krx, report ...)"""
+    lag = (datetime.now(timezone.utc) - event.scheduled_run_time).total_seconds()
+    metrics.SCHEDULER_LAG.observe(max(0.0, lag), event.job_id)
+
+
+scheduler.add_listener(_record_lag, EVENT_JOB_EXECUTED | EVENT_JOB_ERROR)
+
+DEFAULT_INTERVAL             = 5    # 분 — 장중 갱신 주기 (settings.update_interval)
+DEFAULT_OFF_SESSION_INTERVAL = 60   # 분 — 장외 갱신 주기 (settings.off_session_interval)
+
+_last_refresh = {}  # 시장 그룹 → 마지막 갱신 시각(monotonic)
+
+
+def _market_job(market: str, off_session_minutes: int):
+    """시장 그룹 하나의 가격 갱신 — 장외면 off_session 주기가 지났을 때만"""
+    last = _last_refresh.get(market)
+    if not is_open(market) and last is not None and time.monotonic() - last < off_session_minutes * 60:
+        return
+    _last_refresh[market] = time.monotonic()
+    jobs.refresh_prices(markets=[market])
+
+
+def _report_job():
+    jobs.send_report()
+
+
+def _get_int_setting(conn, key: str, default: int) -> int:
+    row = conn.execute("SELECT value FROM settings WHERE key=?", (key,)).fetchone()
+    try:
+        return int(row["value"]) if row else default
+    except ValueError:
+        return default
 
 
-def get_interval() -> int:
+def get_intervals() -> dict:
+    """
+    {"report": 분, "off_session": 분, "markets": {그룹: 장중 주기(분)}}
+    그룹별 장중 주기는 settings.update_interval_<그룹> 으로 개별 지정 가능 (예: update_interval_crypto)
+    """
     conn = get_db()
     try:
-        row = conn.execute(
-            "SELECT value FROM settings WHERE key='update_interval'"
-        ).fetchone()
-        return int(row["value"]) if row else 5
+        base = _get_int_setting(conn, "update_interval", DEFAULT_INTERVAL)
+        return {
+            "report":      base,
+            "off_session": _get_int_setting(conn, "off_session_interval", DEFAULT_OFF_SESSION_INTERVAL),
+            "markets":     {m: _get_int_setting(conn, f"update_interval_{m}", base) for m in MARKETS},
+        }
     finally:
         conn.close()
 
 
 def reset_scheduler():
-    """설정된 주기로 스케줄러 재설정"""
+    """설정된 주기로 스케줄러 재설정 — 시장 그룹별 가격 작업 + 리포트 작업"""
     try:
         for job in scheduler.get_jobs():
             job.remove()
-        minutes = get_interval()
-        scheduler.add_job(_scheduled_job, "interval", minutes=minutes, id="main")
-        print(f"[scheduler] 업데이트 주기: {minutes}분")
+        intervals = get_intervals()
+        for market, minutes in intervals["markets"].items():
+            scheduler.add_job(
+                _market_job, "interval", minutes=minutes,
+                args=[market, intervals["off_session"]],
+                id=f"prices:{market}", coalesce=True, max_instances=1,
+            )
+        scheduler.add_job(
+            _report_job, "interval", minutes=intervals["report"],
+            id="report", coalesce=True, max_instances=1,
+        )
+        per_market = ", ".join(f"{MARKETS[m]['label']} {v}분" for m, v in intervals["markets"].items())
+        print(f"[scheduler] 장중 주기: {per_market} / 장외: {intervals['off_session']}분 / 리포트: {intervals['report']}분")
     except Exception as e:
         print(f"[scheduler] {e}")
@@ -25,3 +25,21 @@ except ImportError:
         print("[config] 환경 변수에서 설정 로드 완료")
     else:
         print("[config] ⚠️ config.py 없음, 환경 변수도 미설정 — 텔레그램 비활성화")
+
+# ─────────────────────────────────────────────
+#  가격 조회 엔진 튜닝 (환경변수로 조정, 기본값 있음)
+# ─────────────────────────────────────────────
+PRICE_FETCH_WORKERS   = int(os.environ.get("PRICE_FETCH_WORKERS", "4"))       # 동시 조회 스레드 수
+PRICE_REQUEST_TIMEOUT = float(os.environ.get("PRICE_REQUEST_TIMEOUT", "10"))  # 요청 1건 타임아웃(초)
+PRICE_CYCLE_DEADLINE  = float(os.environ.get("PRICE_CYCLE_DEADLINE", "60"))   # 갱신 1회 전체 마감(초)
+PRICE_HEDGE_DELAY     = float(os.environ.get("PRICE_HEDGE_DELAY", "1.5"))    # 다음 공급자에 헤지 요청을 보낼 때까지(초)
+CIRCUIT_FAILURE_THRESHOLD = int(os.environ.get("CIRCUIT_FAILURE_THRESHOLD", "3"))  # 연속 실패 N회 → 차단
+CIRCUIT_COOLDOWN          = float(os.environ.get("CIRCUIT_COOLDOWN", "300"))      # 차단 유지(초) 후 시험 호출
+SLOW_REQUEST_MS           = float(os.environ.get("SLOW_REQUEST_MS", "500"))        # 이보다 느린 요청은 쿼리별 시간과 함께 기록
+
+# ─────────────────────────────────────────────
+#  SSE 동시 연결 제한 (워커 프로세스당)
+#  연결 하나가 gthread 스레드 하나를 점유하므로 기본값은 스레드의 절반 — 나머지는 일반 API 몫
+#  초과 연결은 204로 거절 → 브라우저는 폴링으로 전환
+# ─────────────────────────────────────────────
+SSE_MAX_STREAMS = int(os.environ.get("SSE_MAX_STREAMS", str(max(1, int(os.environ.get("GUNICORN_THREADS", "32")) // 2))))
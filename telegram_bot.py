@@ -2,10 +2,17 @@
 텔레그램 모듈 - 메시지 전송, 대시보드 리포트, 봇 폴링
 """
 import asyncio
-import requests
+import hashlib
+import json
 from datetime import datetime
 
-from database import get_db
+import http_client
+import metrics
+
+from database import (
+    get_db, get_index_totals, calc_algamja_index,
+    get_data_versions, get_meta, set_meta,
+)
 from settings import (
     TELEGRAM_BOT_TOKEN, TELEGRAM_CHANNEL_ID,
     NOTIFY_BOT_TOKEN, NOTIFY_CHANNEL_ID,
@@ -21,7 +28,7 @@ def _send_message(token: str, channel: str, text: str, parse_mode: str = None) -
         payload = {"chat_id": channel, "text": text}
         if parse_mode:
             payload["parse_mode"] = parse_mode
-        r = requests.post(
+        r = http_client.post(
             f"https://api.telegram.org/bot{token}/sendMessage",
             json=payload,
             timeout=10,
@@ -57,24 +64,61 @@ def send_notify(text: str, parse_mode: str = None) -> bool:
     return ok
 
 
-def send_dashboard_report():
+# 자산별 집계 + 자산별 최근 예측 방향 + 전체 합계를 한 번에 조회
+_REPORT_SQL = """
+SELECT t.total_hit AS all_h, t.total_miss AS all_m,
+       s.asset_market, s.total_hit AS h, s.total_miss AS m, latest.direction
+FROM index_totals t
+LEFT JOIN asset_stats s ON 1
+LEFT JOIN (
+    SELECT asset_market, direction,
+           ROW_NUMBER() OVER (PARTITION BY asset_market ORDER BY mention_date DESC, id DESC) AS rn
+    FROM predictions
+) latest ON latest.asset_market = s.asset_market AND latest.rn = 1
+WHERE t.id = 1
+ORDER BY s.asset_market
+"""
+
+
+def _age_label(updated_at: str) -> str:
+    """'2024-01-01T09:00:00' → '35분 전' / '3시간 전' / '2일 전'"""
+    try:
+        minutes = max(0, int((datetime.now() - datetime.fromisoformat(updated_at)).total_seconds() // 60))
+    except (TypeError, ValueError):
+        return "알 수 없는 시점"
+    if minutes < 60:
+        return f"{minutes}분 전"
+    if minutes < 1440:
+        return f"{minutes // 60}시간 전"
+    return f"{minutes // 1440}일 전"
+
+
+def send_dashboard_report(force: bool = False):
+    """
+    대시보드 리포트 전송
+    마지막 전송 이후 예측 데이터가 그대로면(데이터 버전·내용 해시 동일) 조회·렌더·전송을 건너뜀
+    force=True: 관리자의 즉시 전송 — 변경 여부와 관계없이 전송
+    """
     conn = get_db()
     try:
-        assets = conn.execute(
-            """SELECT asset_market,
-                      COALESCE(SUM(hit),0)  h,
-                      COALESCE(SUM(miss),0) m
-               FROM predictions
-               GROUP BY asset_market
-               ORDER BY asset_market"""
-        ).fetchall()
+        version = str(get_data_versions(conn, ("predictions",)).get("predictions", (0,))[0])
+        if not force and get_meta(conn, "report_version") == version:
+            print("[report] 변경 없음 → 전송 생략")
+            metrics.TELEGRAM_SENDS.inc("skipped")
+            return
 
-        overall = conn.execute(
-            "SELECT COALESCE(SUM(hit),0) h, COALESCE(SUM(miss),0) m FROM predictions"
-        ).fetchone()
+        rows    = conn.execute(_REPORT_SQL).fetchall()
+        content = json.dumps([tuple(r) for r in rows], ensure_ascii=False)
+        digest  = hashlib.sha256(content.encode()).hexdigest()
+        if not force and get_meta(conn, "report_hash") == digest:
+            set_meta(conn, "report_version", version)
+            conn.commit()
+            print("[report] 수치 변경 없음 → 전송 생략")
+            metrics.TELEGRAM_SENDS.inc("skipped")
+            return
 
-        total   = overall["h"] + overall["m"]
-        algamja = round(overall["h"] / total * 100, 1) if total else 0
+        overall = rows[0] if rows else {"all_h": 0, "all_m": 0}
+        algamja = calc_algamja_index(overall["all_h"], overall["all_m"], 1)
         now     = datetime.now().strftime("%Y-%m-%d %H:%M")
 
         lines = [
@@ -85,16 +129,24 @@ def send_dashboard_report():
             "─" * 34,
         ]
 
-        for a in assets:
-            t    = a["h"] + a["m"]
-            rate = f"{round(a['h']/t*100)}%" if t else "N/A"
-            dir_row = conn.execute(
-                "SELECT direction FROM predictions WHERE asset_market=? ORDER BY mention_date DESC LIMIT 1",
-                (a["asset_market"],)
-            ).fetchone()
-            dir_s = (("📈 UP" if dir_row["direction"] == "UP" else "📉 DOWN") if dir_row else "  -  ")
+        for a in rows:
+            if a["asset_market"] is None:
+                continue  # 예측이 하나도 없을 때의 LEFT JOIN 빈 행
+            t     = a["h"] + a["m"]
+            rate  = f"{round(a['h']/t*100)}%" if t else "N/A"
+            dir_s = (("📈 UP" if a["direction"] == "UP" else "📉 DOWN") if a["direction"] else "  -  ")
             lines.append(f"{a['asset_market']:<12} | {dir_s:<7} | {rate}")
 
+        # 공급자 장애로 시세가 멈춘 자산은 마지막 가격의 경과 시간 표시 (내용 해시에는 넣지 않음)
+        stale = conn.execute(
+            "SELECT asset_market, updated_at FROM prices WHERE stale_since IS NOT NULL ORDER BY asset_market"
+        ).fetchall()
+        if stale:
+            lines.append("")
+            lines.append("⚠️ 시세 지연: " + ", ".join(
+                f"{r['asset_market']} ({_age_label(r['updated_at'])} 가격)" for r in stale
+            ))
+
         lines.append("")
         lines.append(f"🥔 종합 알감자지수: {algamja}%")
         lines.append(
@@ -104,8 +156,15 @@ def send_dashboard_report():
 
         msg = "\n".join(lines)
         print(f"[report] 텔레그램 전송 시도 → 채널 {TELEGRAM_CHANNEL_ID}")
-        send_telegram(msg, parse_mode="HTML")
+        if send_telegram(msg, parse_mode="HTML"):
+            metrics.TELEGRAM_SENDS.inc("sent")
+            set_meta(conn, "report_hash", digest)
+            set_meta(conn, "report_version", version)
+            conn.commit()
+        else:
+            metrics.TELEGRAM_SENDS.inc("failed")
     except Exception as e:
+        metrics.TELEGRAM_SENDS.inc("failed")
         print(f"[report] ❌ 오류: {e}")
     finally:
         conn.close()
@@ -173,11 +232,8 @@ def run_telegram_bot():
         async def cmd_status(update: Update, context):
             conn = get_db()
             try:
-                stats = conn.execute(
-                    "SELECT COALESCE(SUM(hit),0) h, COALESCE(SUM(miss),0) m, COUNT(*) c FROM predictions"
-                ).fetchone()
-                total = stats["h"] + stats["m"]
-                idx   = round(stats["h"] / total * 100, 1) if total else 0
+                stats = get_index_totals(conn)
+                idx   = calc_algamja_index(stats["h"], stats["m"], 1)
                 await update.message.reply_text(
                     f"📊 현재 알감자지수 현황\n"
                     f"총 예측: {stats['c']}건\n"
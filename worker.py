@@ -0,0 +1,124 @@
+"""
+백그라운드 작업 모듈 - 가격 갱신 스케줄러 + 텔레그램 봇을 한 프로세스에서만 실행
+SQLite leases 테이블의 임대를 가진 프로세스가 리더가 되어 백그라운드 작업을 맡고,
+나머지 gunicorn 워커는 웹 요청만 처리 → 웹 워커 수를 늘려도 갱신 작업·봇 폴링이 중복되지 않음
+
+BACKGROUND_ROLE 환경변수:
+  auto (기본) 각 프로세스가 임대를 두고 경쟁 — 이긴 하나만 백그라운드 실행, 리더가 죽으면 다른 프로세스가 인계
+  web         웹 요청만 처리 (Procfile의 worker 프로세스가 따로 있을 때)
+  worker      python worker.py 로 실행하는 전용 백그라운드 프로세스
+"""
+import atexit
+import os
+import socket
+import threading
+import time
+
+from database import get_db, acquire_lease, release_lease, get_data_versions
+
+BACKGROUND_ROLE = os.environ.get("BACKGROUND_ROLE", "auto").lower()
+
+LEASE_NAME     = "background"
+LEASE_TTL      = 30    # 초 — 리더가 이 시간 동안 갱신하지 못하면 다른 프로세스가 인계
+RENEW_INTERVAL = 10    # 초 — 임대 갱신 및 설정 변경 확인 주기
+
+HOLDER = f"{socket.gethostname()}:{os.getpid()}"
+
+_state = {"leader": False, "bot_started": False, "settings_version": None}
+
+
+def _start_jobs():
+    """리더가 되었을 때: 즉시 1회 가격 갱신 + 스케줄러 + 텔레그램 봇"""
+    from jobs import refresh_prices
+    from scheduler import scheduler, reset_scheduler
+    from telegram_bot import run_telegram_bot
+
+    refresh_prices()
+    reset_scheduler()
+    if scheduler.running:
+        scheduler.resume()
+    else:
+        scheduler.start()
+    if not _state["bot_started"]:
+        threading.Thread(target=run_telegram_bot, daemon=True).start()
+        _state["bot_started"] = True
+
+
+def _stop_jobs():
+    """임대를 잃었을 때: 스케줄러 정지 (봇 폴링은 중단할 수 없어 Conflict 로그로 드러남)"""
+    from scheduler import scheduler
+
+    if scheduler.running:
+        scheduler.pause()
+
+
+def _check_settings(conn):
+    """설정이 바뀌었으면(다른 웹 워커가 저장했어도) 스케줄러 주기 재설정"""
+    from scheduler import reset_scheduler
+
+    version = get_data_versions(conn, ("settings",)).get("settings")
+    if _state["settings_version"] is not None and version != _state["settings_version"]:
+        reset_scheduler()
+    _state["settings_version"] = version
+
+
+def _lease_loop():
+    while True:
+        conn = get_db()
+        try:
+            is_leader = acquire_lease(conn, LEASE_NAME, HOLDER, LEASE_TTL)
+            if is_leader and not _state["leader"]:
+                print(f"[worker] 백그라운드 리더 획득 ({HOLDER})")
+                _state["leader"] = True
+                _state["settings_version"] = get_data_versions(conn, ("settings",)).get("settings")
+                _start_jobs()
+            elif not is_leader and _state["leader"]:
+                print(f"[worker] ⚠️ 백그라운드 리더 상실 ({HOLDER}) → 스케줄러 정지")
+                _state["leader"] = False
+                _stop_jobs()
+            elif is_leader:
+                _check_settings(conn)
+        except Exception as e:
+            print(f"[worker] 임대 갱신 오류: {e}")
+        finally:
+            conn.close()
+        time.sleep(RENEW_INTERVAL)
+
+
+def _release():
+    if _state["leader"]:
+        conn = get_db()
+        try:
+            release_lease(conn, LEASE_NAME, HOLDER)
+        finally:
+            conn.close()
+
+
+def is_leader() -> bool:
+    return _state["leader"]
+
+
+def start_background():
+    """웹 프로세스 기동 시 호출 — BACKGROUND_ROLE=web 이면 아무것도 하지 않음"""
+    if BACKGROUND_ROLE == "web":
+        print("[worker] 웹 전용 프로세스 (백그라운드 작업 없음)")
+        return
+    atexit.register(_release)
+    threading.Thread(target=_lease_loop, daemon=True, name="lease-loop").start()
+
+
+# ─────────────────────────────────────────────
+#  전용 백그라운드 프로세스 (Procfile: worker: python worker.py)
+# ─────────────────────────────────────────────
+if __name__ == "__main__":
+    from database import init_db
+    from korean_stocks import load_listing
+
+    print("🥔 알감자지수 백그라운드 워커 시작 중...")
+    init_db()
+    load_listing()  # 가격 갱신 때 종목코드·종목명 → 티커 변환(resolve_korean_stock)에 필요
+    atexit.register(_release)
+    try:
+        _lease_loop()
+    except KeyboardInterrupt:
+        pass